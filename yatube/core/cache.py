@@ -0,0 +1,387 @@
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+TIER_STATS_KEY = 'core:cache:{}:{}'
+TIERS = ('l1', 'l2')
+
+# Django создает экземпляр кеша на каждый поток, а L1 общий для
+# процесса, как у LocMemCache.
+_l1_stores = {}
+_l1_locks = {}
+
+
+def _dumps(value):
+    # Целые числа хранятся как есть, чтобы incr был одним UPDATE.
+    if type(value) is int:
+        return value
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def _loads(value):
+    if isinstance(value, int):
+        return value
+    return pickle.loads(value)
+
+
+class SQLiteCache(BaseCache):
+    """Общий для всех процессов кеш в файле SQLite.
+
+    Не требует отдельного сервиса. add и incr атомарны между
+    процессами, поэтому на нем можно держать версии и блокировки.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+
+    @property
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self._path, timeout=20, isolation_level=None)
+            db.execute('PRAGMA journal_mode = WAL')
+            db.execute('PRAGMA synchronous = NORMAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL'
+                ') WITHOUT ROWID'
+            )
+            self._local.db = db
+        return db
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def get(self, key, default=None, version=None):
+        row = self._db.execute(
+            'SELECT value FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self._key(key, version), time.time()),
+        ).fetchone()
+        return default if row is None else _loads(row[0])
+
+    def get_many(self, keys, version=None):
+        names = {self._key(key, version): key for key in keys}
+        if not names:
+            return {}
+        placeholders = ', '.join('?' * len(names))
+        rows = self._db.execute(
+            f'SELECT key, value FROM cache WHERE key IN ({placeholders}) '
+            'AND (expires IS NULL OR expires > ?)',
+            (*names, time.time()),
+        )
+        return {names[name]: _loads(value) for name, value in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._db.execute(
+            'INSERT OR REPLACE INTO cache VALUES (?, ?, ?)',
+            (
+                self._key(key, version),
+                _dumps(value),
+                self.get_backend_timeout(timeout),
+            ),
+        )
+        self._maybe_cull()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        with self._transaction():
+            self._db.executemany(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?)',
+                [
+                    (self._key(key, version), _dumps(value), expires)
+                    for key, value in data.items()
+                ],
+            )
+        self._maybe_cull()
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        cursor = self._db.execute(
+            'INSERT INTO cache VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE '
+            'SET value = excluded.value, expires = excluded.expires '
+            'WHERE cache.expires IS NOT NULL AND cache.expires <= ?',
+            (
+                self._key(key, version),
+                _dumps(value),
+                self.get_backend_timeout(timeout),
+                time.time(),
+            ),
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        with self._transaction():
+            self._db.execute(
+                'UPDATE cache SET value = value + ? WHERE key = ? '
+                "AND typeof(value) = 'integer' "
+                'AND (expires IS NULL OR expires > ?)',
+                (delta, key, time.time()),
+            )
+            row = self._db.execute(
+                'SELECT value FROM cache WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            raise ValueError(f"Key '{key}' not found")
+        return _loads(row[0])
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        cursor = self._db.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (
+                self.get_backend_timeout(timeout),
+                self._key(key, version),
+                time.time(),
+            ),
+        )
+        return cursor.rowcount == 1
+
+    def has_key(self, key, version=None):
+        return self.get(key, version=version) is not None
+
+    def delete(self, key, version=None):
+        self._db.execute(
+            'DELETE FROM cache WHERE key = ?',
+            (self._key(key, version),),
+        )
+
+    def delete_many(self, keys, version=None):
+        with self._transaction():
+            self._db.executemany(
+                'DELETE FROM cache WHERE key = ?',
+                [(self._key(key, version),) for key in keys],
+            )
+
+    def clear(self):
+        self._db.execute('DELETE FROM cache')
+
+    def _transaction(self):
+        return _Transaction(self._db)
+
+    def _maybe_cull(self):
+        if random.random() * self._cull_frequency >= 1:
+            return
+        db = self._db
+        db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        excess = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        excess -= self._max_entries
+        if excess > 0:
+            db.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY expires IS NULL, expires LIMIT ?)',
+                (excess,),
+            )
+
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+class TieredCache(BaseCache):
+    """Двухуровневый кеш: L1 в памяти процесса поверх общего L2.
+
+    L1 — небольшой LRU с коротким временем жизни, он снимает
+    повторные чтения горячих ключей. Все записи идут в L2, поэтому
+    изменения видят все процессы; ключи с префиксами из
+    OPTIONS['L1_BYPASS'] (версии, счетчики) всегда читаются из L2.
+
+    LOCATION — имя L1 в процессе. OPTIONS: L2 — псевдоним кеша
+    второго уровня, L1_MAX_ENTRIES, L1_TIMEOUT в секундах,
+    L1_BYPASS, STATS_FLUSH_EVERY.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', 'shared')
+        self._l1_max_entries = options.get('L1_MAX_ENTRIES', 1000)
+        self._l1_timeout = options.get('L1_TIMEOUT', 5)
+        self._bypass = tuple(options.get('L1_BYPASS', ()))
+        self._flush_every = options.get('STATS_FLUSH_EVERY', 100)
+        self._l1 = _l1_stores.setdefault(location, OrderedDict())
+        self._lock = _l1_locks.setdefault(location, threading.Lock())
+        self._stats = Counter()
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _cacheable(self, key):
+        return not key.startswith(self._bypass)
+
+    def _l1_get(self, key, version):
+        name = self.make_key(key, version=version)
+        with self._lock:
+            entry = self._l1.get(name)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._l1[name]
+                return None
+            self._l1.move_to_end(name)
+            return entry
+
+    def _l1_set(self, key, value, timeout, version):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            timeout = self._l1_timeout
+        timeout = min(timeout, self._l1_timeout)
+        if timeout <= 0 or not self._cacheable(key):
+            return
+        name = self.make_key(key, version=version)
+        entry = (time.monotonic() + timeout, _dumps(value))
+        with self._lock:
+            self._l1[name] = entry
+            self._l1.move_to_end(name)
+            while len(self._l1) > self._l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, keys, version):
+        with self._lock:
+            for key in keys:
+                self._l1.pop(self.make_key(key, version=version), None)
+
+    def _count(self, tier, hits, misses):
+        self._stats[tier, 'hits'] += hits
+        self._stats[tier, 'misses'] += misses
+        if sum(self._stats.values()) >= self._flush_every:
+            self.flush_stats()
+
+    def get(self, key, default=None, version=None):
+        if self._cacheable(key):
+            entry = self._l1_get(key, version)
+            if entry is not None:
+                self._count('l1', 1, 0)
+                return _loads(entry[1])
+            self._count('l1', 0, 1)
+        missing = object()
+        value = self.l2.get(key, missing, version=version)
+        if value is missing:
+            self._count('l2', 0, 1)
+            return default
+        self._count('l2', 1, 0)
+        self._l1_set(key, value, DEFAULT_TIMEOUT, version)
+        return value
+
+    def get_many(self, keys, version=None):
+        result = {}
+        rest = []
+        l1_misses = 0
+        for key in keys:
+            entry = None
+            if self._cacheable(key):
+                entry = self._l1_get(key, version)
+                l1_misses += entry is None
+            if entry is None:
+                rest.append(key)
+            else:
+                result[key] = _loads(entry[1])
+        self._count('l1', len(result), l1_misses)
+        if rest:
+            found = self.l2.get_many(rest, version=version)
+            self._count('l2', len(found), len(rest) - len(found))
+            for key, value in found.items():
+                self._l1_set(key, value, DEFAULT_TIMEOUT, version)
+            result.update(found)
+        return result
+
+    def _timeout(self, timeout):
+        # Время жизни по умолчанию задает этот кеш, а не L2.
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        self.l2.set(key, value, timeout, version=version)
+        self._l1_set(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        failed = self.l2.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            self._l1_set(key, value, timeout, version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1_delete([key], version)
+        return self.l2.add(
+            key, value, self._timeout(timeout), version=version,
+        )
+
+    def incr(self, key, delta=1, version=None):
+        self._l1_delete([key], version)
+        return self.l2.incr(key, delta, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, self._timeout(timeout), version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, version=version) is not None
+
+    def delete(self, key, version=None):
+        self._l1_delete([key], version)
+        self.l2.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self._l1_delete(keys, version)
+        self.l2.delete_many(keys, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._l1.clear()
+        self._stats.clear()
+        self.l2.clear()
+
+    def flush_stats(self):
+        """Переносит счетчики попаданий процесса в общий L2."""
+        stats, self._stats = self._stats, Counter()
+        for (tier, kind), count in stats.items():
+            if not count:
+                continue
+            key = TIER_STATS_KEY.format(tier, kind)
+            try:
+                self.l2.incr(key, count)
+            except ValueError:
+                if not self.l2.add(key, count, None):
+                    self.l2.incr(key, count)
+
+    def get_tier_stats(self):
+        """Попадания, промахи и доля попаданий по уровням, все процессы."""
+        self.flush_stats()
+        keys = [
+            TIER_STATS_KEY.format(tier, kind)
+            for tier in TIERS
+            for kind in ('hits', 'misses')
+        ]
+        values = self.l2.get_many(keys)
+        report = {}
+        for tier in TIERS:
+            hits = values.get(TIER_STATS_KEY.format(tier, 'hits'), 0)
+            misses = values.get(TIER_STATS_KEY.format(tier, 'misses'), 0)
+            total = hits + misses
+            report[tier] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / total, 4) if total else None,
+            }
+        return report
@@ -0,0 +1,117 @@
+import gzip
+import re
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+)
+# Внутри этих тегов пробелы значимы.
+PROTECTED = re.compile(
+    rb'<(pre|textarea|script|style)\b.*?</\1\s*>', re.S | re.I,
+)
+COMMENT = re.compile(rb'<!--(?!\[if).*?-->', re.S)
+NEWLINES = re.compile(rb'\s*\n\s*')
+SPACES = re.compile(rb'[ \t]{2,}')
+
+
+def _collapse(chunk):
+    chunk = COMMENT.sub(b'', chunk)
+    chunk = NEWLINES.sub(b'\n', chunk)
+    return SPACES.sub(b' ', chunk)
+
+
+def minify_html(content):
+    """Убирает комментарии и повторяющиеся пробелы и переводы строк.
+
+    Браузер все равно схлопывает пробелы, поэтому вид страницы
+    не меняется. pre, textarea, script и style не трогаются.
+    """
+    parts = []
+    position = 0
+    for match in PROTECTED.finditer(content):
+        parts.append(_collapse(content[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(_collapse(content[position:]))
+    return b''.join(parts)
+
+
+def is_compressible(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.has_header('Content-Encoding')
+        and response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+    )
+
+
+def minify_response(response):
+    """Минифицирует HTML-ответ один раз, повторный вызов ничего не делает."""
+    if (
+        getattr(response, 'minified', False)
+        or not settings.COMPRESSION['MINIFY_HTML']
+        or not response.get('Content-Type', '').startswith('text/html')
+    ):
+        return
+    response.content = minify_html(response.content)
+    if response.has_header('Content-Length'):
+        response['Content-Length'] = str(len(response.content))
+    response.minified = True
+
+
+def encodings():
+    """Поддерживаемые сжатия в порядке предпочтения."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding):
+    """Лучшее сжатие из принимаемых клиентом или None."""
+    accepted = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for coding in encodings():
+        if accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(
+            content, quality=settings.COMPRESSION['BROTLI_QUALITY'],
+        )
+    return gzip.compress(
+        content, settings.COMPRESSION['GZIP_LEVEL'], mtime=0,
+    )
+
+
+def encode_all(content):
+    """Сжатые варианты содержимого для хранения в кеше страниц.
+
+    Короткие ответы и ответы, которые не стали меньше, не сжимаются.
+    """
+    if len(content) < settings.COMPRESSION['MIN_LENGTH']:
+        return {}
+    variants = {}
+    for encoding in encodings():
+        compressed = compress(content, encoding)
+        if len(compressed) < len(content):
+            variants[encoding] = compressed
+    return variants
@@ -0,0 +1,86 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_local = threading.local()
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение с SQLite из SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+class WriteLog:
+    """Отмечает, писал ли блок replica_reads() в реплицируемые модели."""
+    wrote = False
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Разрешает читать с реплик внутри блока.
+
+    Возвращает WriteLog: по нему видно, была ли в блоке запись
+    в модели из DATABASE_REPLICA_APPS, в том числе в запросе GET.
+    """
+    previous = getattr(_local, 'enabled', False)
+    previous_log = getattr(_local, 'writes', None)
+    _local.enabled = enabled
+    _local.writes = WriteLog()
+    try:
+        yield _local.writes
+    finally:
+        if previous_log is not None and _local.writes.wrote:
+            # Запись во вложенном блоке видна и внешнему.
+            previous_log.wrote = True
+        _local.enabled = previous
+        _local.writes = previous_log
+
+
+class ReplicaRouter:
+    """Чтение моделей из DATABASE_REPLICA_APPS со случайной реплики.
+
+    Реплики используются только внутри replica_reads() и вне
+    транзакций: в транзакции чтение должно видеть свои записи.
+    Запись всегда идет в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas
+            or not getattr(_local, 'enabled', False)
+            or model._meta.app_label not in settings.DATABASE_REPLICA_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        writes = getattr(_local, 'writes', None)
+        if (
+            writes is not None
+            and model._meta.app_label in settings.DATABASE_REPLICA_APPS
+        ):
+            writes.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
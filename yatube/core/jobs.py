@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+def claim(model, limit, timeout, max_attempts):
+    """Забирает задания очереди model, зависшие задания берутся повторно.
+
+    У модели есть поля status, attempts, started и error и статусы
+    PENDING, RUNNING и FAILED. Число попыток служит меткой захвата:
+    задание забирает только тот, кто первым увеличит его, даже если
+    двое увидели одно и то же зависшее задание. Зависшее задание,
+    исчерпавшее max_attempts (например, обработчик на нем падает),
+    помечается FAILED.
+    """
+    expired = Q(
+        status=model.RUNNING,
+        started__lt=timezone.now() - timedelta(seconds=timeout),
+    )
+    model.objects.filter(expired, attempts__gte=max_attempts).update(
+        status=model.FAILED,
+        error='Обработка не завершилась за отведенное время.',
+    )
+    candidates = model.objects.filter(
+        Q(status=model.PENDING)
+        | expired & Q(attempts__lt=max_attempts)
+    ).values_list('pk', 'status', 'attempts')[:limit]
+    claimed = []
+    for pk, status, attempts in candidates:
+        taken = model.objects.filter(
+            pk=pk, status=status, attempts=attempts,
+        ).update(
+            status=model.RUNNING,
+            attempts=F('attempts') + 1,
+            started=timezone.now(),
+        )
+        if taken:
+            claimed.append(pk)
+    return claimed
+
+
+def _in_thread(func, item):
+    try:
+        return func(item)
+    finally:
+        close_old_connections()
+
+
+def run_in_threads(func, items, workers=1):
+    """Вызывает func для каждого элемента в workers потоках."""
+    if workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(partial(_in_thread, func), items))
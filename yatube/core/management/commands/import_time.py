@@ -0,0 +1,120 @@
+import json
+import os
+import subprocess
+import re
+import sys
+import time
+from collections import Counter
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Старт рабочего процесса: импорт wsgi.py вместе с прогревом.
+STARTUP_SCRIPT = (
+    'import time\n'
+    'started = time.perf_counter()\n'
+    'import yatube.wsgi\n'
+    'print(time.perf_counter() - started)\n'
+)
+PREFIX = 'import time:'
+# Строки, которые wsgi.py пишет после прогрева.
+WARMUP_LINE = re.compile(r'^warmup (\w+): \d+ in ([\d.]+)s$', re.M)
+
+TIMINGS = ('process_ms', 'wsgi_ms', 'warmup_ms', 'import_ms')
+
+
+def parse_importtime(stderr):
+    """Время импорта по пакетам верхнего уровня из вывода -X importtime.
+
+    Возвращает Counter микросекунд собственного времени модулей.
+    """
+    packages = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith(PREFIX):
+            continue
+        self_us, _, name = line[len(PREFIX):].split('|')
+        if not self_us.strip().isdigit():
+            continue
+        packages[name.strip().split('.')[0]] += int(self_us)
+    return packages
+
+
+def measure(profile):
+    """Запускает процесс с профилем настроек и замеряет его старт."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=f'yatube.settings.{profile}')
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise CommandError(
+            f'Профиль {profile} не запустился:\n{result.stderr[-2000:]}'
+        )
+    process_ms = (time.perf_counter() - started) * 1000
+    packages = parse_importtime(result.stderr)
+    return {
+        'process_ms': process_ms,
+        'wsgi_ms': float(result.stdout.split()[-1]) * 1000,
+        'warmup_ms': sum(
+            float(seconds) * 1000
+            for _, seconds in WARMUP_LINE.findall(result.stderr)
+        ),
+        'import_ms': sum(packages.values()) / 1000,
+        'packages': packages,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет старт рабочего процесса (импорт wsgi.py) для профилей '
+        'настроек через python -X importtime и выводит самые долгие '
+        'по импорту пакеты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile', action='append', dest='profiles',
+            help='Профиль из yatube.settings, по умолчанию dev и prod.',
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument(
+            '--output',
+            help='Сохранить результаты в JSON-файл.',
+        )
+
+    def handle(self, *args, **options):
+        report = {}
+        for profile in options['profiles'] or ('dev', 'prod'):
+            runs = [measure(profile) for _ in range(options['repeat'])]
+            packages = Counter()
+            for run in runs:
+                packages.update(run['packages'])
+            report[profile] = {
+                key: round(median(run[key] for run in runs), 1)
+                for key in TIMINGS
+            }
+            report[profile]['top'] = {
+                name: round(total / len(runs) / 1000, 1)
+                for name, total in packages.most_common(options['top'])
+            }
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def print_report(self, report):
+        for profile, result in report.items():
+            self.stdout.write(
+                f'{profile}: процесс {result["process_ms"]:.1f} мс, '
+                f'wsgi.py {result["wsgi_ms"]:.1f} мс, '
+                f'прогрев {result["warmup_ms"]:.1f} мс, '
+                f'импорт всех модулей {result["import_ms"]:.1f} мс'
+            )
+            for name, import_ms in result['top'].items():
+                self.stdout.write(f'  {name:<28}{import_ms:>9.1f} мс')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует все view, вызывает reverse для всех адресов '
+        'и компилирует все шаблоны, выводит время каждого этапа.'
+    )
+
+    def handle(self, *args, **options):
+        total = 0
+        for name, (seconds, count) in warm_up().items():
+            total += seconds
+            self.stdout.write(f'{name}: {count} за {seconds * 1000:.1f} мс')
+        self.stdout.write(f'всего: {total * 1000:.1f} мс')
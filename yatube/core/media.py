@@ -0,0 +1,79 @@
+import mimetypes
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """Один диапазон из заголовка Range: (начало, конец) включительно.
+
+    Несколько диапазонов и ошибки синтаксиса игнорируются — файл
+    отдается целиком. Диапазон за концом файла — RangeNotSatisfiable.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        length = int(end)
+        if not length:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if end and start > int(end):
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = int(end) if end else size - 1
+    return start, min(end, size - 1)
+
+
+def _read(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def file_response(request, path, size, last_modified):
+    """Ответ с файлом: целиком через FileResponse или диапазон.
+
+    Целый файл может уйти через wsgi.file_wrapper (sendfile),
+    диапазон читается частями по CHUNK_SIZE.
+    """
+    byte_range = None
+    header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if header and (not if_range or if_range == last_modified):
+        try:
+            byte_range = parse_range(header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    file = open(path, 'rb')
+    if byte_range is None:
+        return FileResponse(file)
+    start, end = byte_range
+    content_type, _ = mimetypes.guess_type(path)
+    response = StreamingHttpResponse(
+        _read(file, start, end - start + 1),
+        status=206,
+        content_type=content_type or 'application/octet-stream',
+    )
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,124 @@
+import cProfile
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import compression, db, profiling
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ProfilingMiddleware:
+    """Замеряет время запроса, SQL, шаблоны и кеш по каждой странице.
+
+    Часть запросов, заданная PROFILING['SAMPLE_RATE'], дополнительно
+    профилируется cProfile.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        profiling.install_template_timer()
+
+    def __call__(self, request):
+        profiling.install_cache_counter()
+        collector = profiling.start()
+        profiler = None
+        if random.random() < settings.PROFILING['SAMPLE_RATE']:
+            profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(collector.sql_wrapper)
+                    )
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+        finally:
+            profiling.stop()
+        wall_time = time.perf_counter() - started
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        profiling.record(view_name, collector, wall_time)
+        if profiler is not None:
+            profiling.save_profile(profiler, view_name, wall_time)
+        return response
+
+
+class ReplicaMiddleware:
+    """Читающие запросы обслуживаются репликами.
+
+    После запроса, меняющего данные (не GET или с записью в базу,
+    как подписка по ссылке), клиент на DATABASE_REPLICA_PIN_SECONDS
+    закрепляется за основной базой и видит свои записи, даже если
+    реплика отстает.
+    """
+    cookie_name = 'db_pinned'
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        enabled = (
+            request.method in SAFE_METHODS
+            and self.cookie_name not in request.COOKIES
+        )
+        with db.replica_reads(enabled) as writes:
+            response = self.get_response(request)
+        if request.method not in SAFE_METHODS or writes.wrote:
+            response.set_cookie(
+                self.cookie_name,
+                '1',
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
+
+
+class CompressionMiddleware:
+    """Минифицирует HTML и сжимает ответ в br или gzip.
+
+    Сжатие выбирается по Accept-Encoding. Если ответ уже несет
+    сжатые варианты (страницы из кеша), они отдаются как есть.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not compression.is_compressible(response):
+            return response
+        compression.minify_response(response)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.negotiate(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''),
+        )
+        if encoding is None:
+            return response
+        variants = getattr(response, 'precompressed', None)
+        if variants is None:
+            variants = compression.encode_all(response.content)
+        if encoding not in variants:
+            return response
+        response.content = variants[encoding]
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Length'] = str(len(response.content))
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.template.backends.django import Template
+
+from .stats import BatchedCounters
+
+STATS_KEY = 'core:profiling:{}:{}'
+VIEWS_KEY = 'core:profiling:views'
+METRICS = (
+    'requests',
+    'wall_us',
+    'sql_count',
+    'sql_us',
+    'template_us',
+    'cache_hits',
+    'cache_misses',
+)
+
+_local = threading.local()
+_known_views = set()
+_totals = BatchedCounters()
+
+
+class Collector:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.sql_count += 1
+
+
+def start():
+    _local.collector = Collector()
+    return _local.collector
+
+
+def stop():
+    _local.collector = None
+
+
+def current():
+    return getattr(_local, 'collector', None)
+
+
+def install_template_timer():
+    """Оборачивает отрисовку шаблонов замером времени."""
+    if getattr(Template.render, 'profiled', False):
+        return
+    original = Template.render
+
+    @wraps(original)
+    def render(self, context=None, request=None):
+        collector = current()
+        if collector is None:
+            return original(self, context, request)
+        collector.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            collector.template_depth -= 1
+            if not collector.template_depth:
+                collector.template_time += time.perf_counter() - started
+
+    render.profiled = True
+    Template.render = render
+
+
+def install_cache_counter(alias='default'):
+    """Считает попадания и промахи кеша текущего потока."""
+    backend = caches[alias]
+    if getattr(backend, 'profiled', False):
+        return
+    get, get_many = backend.get, backend.get_many
+
+    @wraps(get)
+    def counted_get(key, default=None, version=None):
+        value = get(key, default, version)
+        collector = current()
+        if collector is not None:
+            if value is default:
+                collector.cache_misses += 1
+            else:
+                collector.cache_hits += 1
+        return value
+
+    @wraps(get_many)
+    def counted_get_many(keys, version=None):
+        keys = list(keys)
+        values = get_many(keys, version)
+        collector = current()
+        if collector is not None:
+            collector.cache_hits += len(values)
+            collector.cache_misses += len(keys) - len(values)
+        return values
+
+    backend.get = counted_get
+    backend.get_many = counted_get_many
+    backend.profiled = True
+
+
+def record(view_name, collector, wall_time):
+    """Добавляет замеры запроса к сводке по странице.
+
+    Суммы копятся в процессе и пишутся в кеш пачками.
+    """
+    if view_name not in _known_views:
+        views = cache.get(VIEWS_KEY) or []
+        if view_name not in views:
+            cache.set(VIEWS_KEY, views + [view_name], None)
+        _known_views.add(view_name)
+    values = {
+        'requests': 1,
+        'wall_us': int(wall_time * 1e6),
+        'sql_count': collector.sql_count,
+        'sql_us': int(collector.sql_time * 1e6),
+        'template_us': int(collector.template_time * 1e6),
+        'cache_hits': collector.cache_hits,
+        'cache_misses': collector.cache_misses,
+    }
+    for metric, value in values.items():
+        if value:
+            _totals.add(STATS_KEY.format(view_name, metric), value)
+
+
+def get_stats():
+    """Сводка по страницам: суммы и средние на запрос."""
+    _totals.flush()
+    views = cache.get(VIEWS_KEY) or []
+    keys = {
+        (view, metric): STATS_KEY.format(view, metric)
+        for view in views for metric in METRICS
+    }
+    values = cache.get_many(keys.values())
+    result = {}
+    for view in views:
+        totals = {
+            metric: values.get(keys[view, metric], 0) for metric in METRICS
+        }
+        requests = totals['requests'] or 1
+        result[view] = {
+            'requests': totals['requests'],
+            'wall_ms': totals['wall_us'] / requests / 1000,
+            'sql_count': totals['sql_count'] / requests,
+            'sql_ms': totals['sql_us'] / requests / 1000,
+            'template_ms': totals['template_us'] / requests / 1000,
+            'cache_hits': totals['cache_hits'],
+            'cache_misses': totals['cache_misses'],
+        }
+    return result
+
+
+def save_profile(profiler, view_name, wall_time):
+    """Сохраняет профиль cProfile, старые файлы удаляются."""
+    directory = settings.PROFILING['PROFILE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    name = '{}-{:09d}-{}-{:.0f}ms.prof'.format(
+        time.strftime('%Y%m%d-%H%M%S'),
+        time.time_ns() % 10 ** 9,
+        view_name.replace(':', '-'),
+        wall_time * 1000,
+    )
+    profiler.dump_stats(os.path.join(directory, name))
+    profiles = sorted(
+        (entry for entry in os.scandir(directory)
+         if entry.name.endswith('.prof')),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in profiles[:-settings.PROFILING['MAX_PROFILES']]:
+        os.remove(entry.path)
@@ -0,0 +1,70 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+RATE_KEY = 'core:ratelimit:{}:{}:{}'
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60): число запросов и период в секундах."""
+    limit, period = rate.split('/')
+    return int(limit), PERIODS[period[0]]
+
+
+def client_key(request):
+    """Пользователь из сессии, для гостей — IP.
+
+    Пользователь не загружается из базы, достаточно id в сессии.
+    """
+    user_id = request.session.get(SESSION_KEY)
+    if user_id:
+        return f'user:{user_id}'
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+def hit(name, key, limit, period):
+    """Учитывает запрос в скользящем окне.
+
+    Счетчики текущего и прошлого окна лежат в кеше, прошлое окно
+    учитывается с весом оставшейся доли периода. Возвращает 0, если
+    запрос в пределах лимита, иначе — через сколько секунд повторить.
+    """
+    now = time.time()
+    window, elapsed = divmod(now, period)
+    current_key = RATE_KEY.format(name, key, int(window))
+    cache.add(current_key, 0, period * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        cache.set(current_key, 1, period * 2)
+        current = 1
+    previous = cache.get(RATE_KEY.format(name, key, int(window) - 1), 0)
+    if previous * (1 - elapsed / period) + current <= limit:
+        return 0
+    return max(math.ceil(period - elapsed), 1)
+
+
+def ratelimit(name, methods=('POST',)):
+    """Ограничивает частоту запросов к view по RATELIMITS[name].
+
+    Учитываются только запросы с методами из methods, None — все.
+    Сверх лимита отвечает RATELIMIT_VIEW со статусом 429.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            rate = settings.RATELIMITS.get(name)
+            if rate and (methods is None or request.method in methods):
+                retry_after = hit(name, client_key(request), *parse_rate(rate))
+                if retry_after:
+                    too_many_requests = import_string(settings.RATELIMIT_VIEW)
+                    return too_many_requests(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
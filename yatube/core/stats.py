@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+
+FLUSH_EVERY = 100
+FLUSH_INTERVAL = 10
+
+
+def incr(key, delta):
+    """Атомарно увеличивает счетчик в кеше, создавая его при отсутствии."""
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+class BatchedCounters:
+    """Счетчики мониторинга, которые копятся в памяти процесса.
+
+    В общий кеш они сбрасываются пачкой: каждые FLUSH_EVERY обновлений
+    или раз в FLUSH_INTERVAL секунд, а также перед чтением сводки.
+    Так запросы не пишут в общий кеш на каждое попадание.
+    """
+
+    def __init__(self, flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL):
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._pending = Counter()
+        self._updates = 0
+        self._flushed = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, key, delta=1):
+        with self._lock:
+            self._pending[key] += delta
+            self._updates += 1
+            due = (
+                self._updates >= self.flush_every
+                or time.monotonic() - self._flushed >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._updates = 0
+            self._flushed = time.monotonic()
+        for key, delta in pending.items():
+            if delta:
+                incr(key, delta)
+
+    def discard(self):
+        """Отбрасывает еще не записанные в кеш значения."""
+        with self._lock:
+            self._pending.clear()
+            self._updates = 0
@@ -0,0 +1,52 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Картинки и шрифты уже сжаты, их не пережимаем.
+COMPRESSIBLE = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.map')
+MIN_SIZE = 256
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем в имени и заранее сжатыми копиями.
+
+    Рядом с каждым текстовым файлом collectstatic кладет .gz и,
+    если установлен пакет brotli, .br — веб-сервер отдает их
+    без сжатия на лету (gzip_static, brotli_static в nginx).
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        # Файлы со ссылками обрабатываются в несколько проходов,
+        # сжимается только итоговая версия.
+        hashed_names = {}
+        processed = super().post_process(paths, dry_run=dry_run, **options)
+        for name, hashed_name, result in processed:
+            yield name, hashed_name, result
+            if hashed_name and not isinstance(result, Exception):
+                hashed_names[name] = hashed_name
+        if dry_run:
+            return
+        for hashed_name in hashed_names.values():
+            if hashed_name.endswith(COMPRESSIBLE):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < MIN_SIZE:
+            return
+        variants = {'.gz': gzip.compress(content, 9)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content)
+        for suffix, compressed in variants.items():
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
@@ -0,0 +1,36 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings, runner
+
+
+class DiscoverRunner(runner.DiscoverRunner):
+    """Запуск тестов с отдельными пустыми кешами.
+
+    Кеши с файлами на диске (общий SQLite-кеш) на время тестов
+    переносятся во временную папку, чтобы не стереть кеш сайта.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix='yatube-test-cache-')
+        isolated = {}
+        for alias, config in settings.CACHES.items():
+            location = config.get('LOCATION', '')
+            if os.path.isabs(location):
+                config = dict(config, LOCATION=os.path.join(
+                    self.cache_dir, os.path.basename(location),
+                ))
+            isolated[alias] = config
+        self.caches_override = override_settings(CACHES=isolated)
+        self.caches_override.enable()
+        for alias in settings.CACHES:
+            caches[alias].clear()
+
+    def teardown_test_environment(self, **kwargs):
+        self.caches_override.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -1,10 +1,39 @@
+import gzip
+import os
+import shutil
+import tempfile
 from http import HTTPStatus
+from importlib import import_module
+from io import StringIO
+from unittest import mock
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+from . import compression, db, profiling
+from .cache import SQLiteCache, TieredCache
+from .management.commands.import_time import parse_importtime
+from .middleware import ReplicaMiddleware
+from .warmup import compile_templates, reverse_urls
 
 User = get_user_model()
 
+TEMP_PROFILE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
 
 class CoreURLTests(TestCase):
     def setUp(self):
@@ -15,3 +44,452 @@ class CoreURLTests(TestCase):
         """Неизвестный URL."""
         response = self.guest_client.get('/unexisting_page/')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class ProfilingTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PROFILE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        # Список страниц в кеше очищен, процесс должен записать его заново.
+        profiling._known_views.clear()
+        profiling._totals.discard()
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='password',
+        )
+        self.guest_client = Client()
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def test_stats_only_for_staff(self):
+        """Сводка замеров недоступна обычным посетителям."""
+        response = self.guest_client.get(reverse('profiling_stats'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_requests_are_aggregated_per_view(self):
+        """Замеры запросов собираются по имени страницы."""
+        self.guest_client.get(reverse('posts:index'))
+        self.guest_client.get(reverse('posts:index'))
+        stats = self.admin_client.get(reverse('profiling_stats')).json()
+        index = stats['posts:index']
+        self.assertEqual(index['requests'], 2)
+        self.assertGreater(index['wall_ms'], 0)
+        self.assertGreater(index['sql_count'], 0)
+        self.assertGreater(index['template_ms'], 0)
+        self.assertGreater(index['cache_hits'], 0)
+        self.assertGreater(index['cache_misses'], 0)
+
+    @override_settings(PROFILING={
+        'ENABLED': True,
+        'SAMPLE_RATE': 1.0,
+        'PROFILE_DIR': TEMP_PROFILE_DIR,
+        'MAX_PROFILES': 2,
+    })
+    def test_sampled_profiles_are_rotated(self):
+        """Профили cProfile пишутся в каталог и не копятся сверх лимита."""
+        client = Client()
+        for _ in range(3):
+            client.get(reverse('about:author'))
+        profiles = os.listdir(TEMP_PROFILE_DIR)
+        self.assertEqual(len(profiles), 2)
+        self.assertTrue(all(name.endswith('.prof') for name in profiles))
+
+
+class SqlitePragmaTests(TestCase):
+    def test_pragmas_applied_to_connection(self):
+        """Новые соединения с SQLite получают настройки SQLITE_PRAGMAS."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(
+                cursor.fetchone()[0],
+                settings.SQLITE_PRAGMAS['busy_timeout'],
+            )
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = db.ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def route(self, request):
+        """Куда middleware направит чтение постов в этом запросе."""
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        response = ReplicaMiddleware(view)(request)
+        return seen[0], response
+
+    def test_reads_go_to_replica_only_when_enabled(self):
+        """Чтение идет с реплики только внутри replica_reads()."""
+        self.assertIsNone(self.router.db_for_read(Post))
+        with db.replica_reads():
+            self.assertEqual(self.router.db_for_read(Post), 'replica')
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_get_reads_from_replica(self):
+        """GET без закрепления читает с реплики."""
+        alias, response = self.route(self.factory.get('/'))
+        self.assertEqual(alias, 'replica')
+        self.assertNotIn(ReplicaMiddleware.cookie_name, response.cookies)
+
+    def test_post_pins_client_to_primary(self):
+        """После POST клиент читает из основной базы."""
+        alias, response = self.route(self.factory.post('/'))
+        self.assertIsNone(alias)
+        self.assertIn(ReplicaMiddleware.cookie_name, response.cookies)
+        request = self.factory.get('/')
+        request.COOKIES[ReplicaMiddleware.cookie_name] = '1'
+        alias, response = self.route(request)
+        self.assertIsNone(alias)
+
+    def test_get_with_write_pins_client_to_primary(self):
+        """GET, который пишет в базу, тоже закрепляет клиента."""
+        def view(request):
+            self.router.db_for_write(Post)
+            return HttpResponse()
+
+        response = ReplicaMiddleware(view)(self.factory.get('/'))
+        self.assertIn(ReplicaMiddleware.cookie_name, response.cookies)
+
+    def test_nested_write_seen_by_outer_block(self):
+        """Запись во вложенном replica_reads() видна внешнему блоку."""
+        with db.replica_reads() as writes:
+            with db.replica_reads(False):
+                self.router.db_for_write(Post)
+        self.assertTrue(writes.wrote)
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.cache = SQLiteCache(os.path.join(directory, 'cache.sqlite3'), {})
+
+    def test_values_and_expiry(self):
+        """Значения любых типов хранятся до истечения срока."""
+        self.cache.set('page', {'content': b'<html>'})
+        self.cache.set('gone', 'value', -1)
+        self.assertEqual(self.cache.get('page'), {'content': b'<html>'})
+        self.assertIsNone(self.cache.get('gone'))
+        self.assertEqual(
+            self.cache.get_many(['page', 'gone', 'missing']),
+            {'page': {'content': b'<html>'}},
+        )
+
+    def test_add_and_incr(self):
+        """add не перезаписывает живой ключ, incr меняет число."""
+        self.assertTrue(self.cache.add('version', 1))
+        self.assertFalse(self.cache.add('version', 5))
+        self.assertEqual(self.cache.incr('version', 2), 3)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+        self.cache.set('lock', 1, -1)
+        self.assertTrue(self.cache.add('lock', 2))
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'core.cache.TieredCache',
+        'LOCATION': 'tiered-tests',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_BYPASS': ['version:'],
+            'STATS_FLUSH_EVERY': 1000,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tiered-tests-shared',
+    },
+})
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = TieredCache('tiered-tests', settings.CACHES['default'])
+        self.cache.clear()
+        self.l2 = self.cache.l2
+
+    def test_reads_are_served_from_l1(self):
+        """Повторное чтение не доходит до L2."""
+        self.l2.set('page', 'content')
+        self.assertEqual(self.cache.get('page'), 'content')
+        self.l2.set('page', 'changed elsewhere')
+        self.assertEqual(self.cache.get('page'), 'content')
+        stats = self.cache.get_tier_stats()
+        self.assertEqual(stats['l1'], {
+            'hits': 1, 'misses': 1, 'hit_rate': 0.5,
+        })
+        self.assertEqual(stats['l2']['hits'], 1)
+
+    def test_version_keys_bypass_l1(self):
+        """Версии читаются из L2 и сразу видны всем процессам."""
+        self.cache.set('version:posts', 1)
+        self.l2.incr('version:posts')
+        self.assertEqual(self.cache.get('version:posts'), 2)
+        self.assertEqual(self.cache.get_many(['version:posts']), {
+            'version:posts': 2,
+        })
+
+    def test_writes_reach_l2(self):
+        """Запись и удаление видны в L2."""
+        self.cache.set_many({'a': 1, 'b': 2})
+        self.assertEqual(self.l2.get_many(['a', 'b']), {'a': 1, 'b': 2})
+        self.cache.delete('a')
+        self.assertIsNone(self.l2.get('a'))
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.incr('b'), 3)
+        self.assertEqual(self.cache.get('b'), 3)
+
+
+class WarmUpTests(SimpleTestCase):
+    def test_warmup_reports_phases(self):
+        """Команда warmup проходит все этапы и выводит их время."""
+        out = StringIO()
+        call_command('warmup', stdout=out)
+        output = out.getvalue()
+        for phase in ('imports', 'urls', 'templates', 'всего'):
+            self.assertIn(phase, output)
+
+    def test_templates_compiled(self):
+        """Прогрев компилирует шаблоны проекта и приложений."""
+        self.assertGreater(compile_templates(), 0)
+        self.assertGreater(reverse_urls(), 0)
+
+
+class SettingsProfileTests(SimpleTestCase):
+    def test_prod_has_no_debug_tooling(self):
+        """Профиль prod не подключает debug_toolbar и кеширует шаблоны."""
+        prod = import_module('yatube.settings.prod')
+        self.assertFalse(prod.DEBUG)
+        self.assertNotIn('debug_toolbar', prod.INSTALLED_APPS)
+        self.assertFalse(any(
+            'debug_toolbar' in name for name in prod.MIDDLEWARE
+        ))
+        loaders = prod.TEMPLATES[0]['OPTIONS']['loaders']
+        self.assertEqual(
+            loaders[0][0],
+            'django.template.loaders.cached.Loader',
+        )
+
+    def test_parse_importtime(self):
+        """Время импорта суммируется по пакетам верхнего уровня."""
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       100 |        100 |   django.utils\n'
+            'import time:        50 |        150 | django\n'
+            'warmup urls: 3 in 0.001s\n'
+            'import time:        20 |         20 | posts\n'
+        )
+        self.assertEqual(
+            parse_importtime(stderr),
+            {'django': 150, 'posts': 20},
+        )
+
+    def test_import_time_command(self):
+        """Команда import_time замеряет старт процесса с профилем."""
+        out = StringIO()
+        call_command(
+            'import_time', '--profile=prod', '--repeat=1', stdout=out,
+        )
+        self.assertIn('prod: процесс', out.getvalue())
+        self.assertIn('django', out.getvalue())
+
+
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    @override_settings(RATELIMITS={'add_comment': '2/m'})
+    def test_user_over_limit_gets_429(self):
+        """Сверх лимита комментарий не создается, ответ 429."""
+        url = reverse('posts:add_comment', args=(self.post.pk,))
+        for _ in range(2):
+            self.authorized_client.post(url, {'text': 'Комментарий'})
+        # Только чтение сессии.
+        with self.assertNumQueries(1):
+            response = self.authorized_client.post(url, {'text': 'Спам'})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertTemplateUsed(response, 'core/429.html')
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    @override_settings(RATELIMITS={'signup': '1/h'})
+    def test_guest_limited_by_ip_without_queries(self):
+        """Гости ограничиваются по IP, отказ не обращается к базе."""
+        url = reverse('users:signup')
+        guest = Client(REMOTE_ADDR='10.0.0.1')
+        guest.post(url, {'username': ''})
+        with self.assertNumQueries(0):
+            response = guest.post(url, {'username': ''})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        response = Client(REMOTE_ADDR='10.0.0.2').post(url, {'username': ''})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(guest.get(url).status_code, HTTPStatus.OK)
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaServingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'), exist_ok=True)
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'a.txt'), 'wb') as f:
+            f.write(b'0123456789')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def get(self, path='/media/posts/a.txt', **headers):
+        return Client().get(path, **headers)
+
+    def test_file_streamed_with_cache_headers(self):
+        """Файл отдается целиком, с долгим кешем и поддержкой Range."""
+        response = self.get()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        not_modified = self.get(
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(not_modified.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_range_requests(self):
+        """Диапазоны отдаются со статусом 206, за концом файла — 416."""
+        cases = {
+            'bytes=2-5': (b'2345', 'bytes 2-5/10'),
+            'bytes=7-': (b'789', 'bytes 7-9/10'),
+            'bytes=-3': (b'789', 'bytes 7-9/10'),
+            'bytes=8-100': (b'89', 'bytes 8-9/10'),
+        }
+        for header, (content, content_range) in cases.items():
+            with self.subTest(header=header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.PARTIAL_CONTENT,
+                )
+                self.assertEqual(
+                    b''.join(response.streaming_content), content,
+                )
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(response['Content-Length'],
+                                 str(len(content)))
+        response = self.get(HTTP_RANGE='bytes=10-')
+        self.assertEqual(
+            response.status_code,
+            HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+        )
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_missing_and_outside_files_not_found(self):
+        """Нет файла или путь за пределами MEDIA_ROOT — 404."""
+        for path in ('/media/posts/b.txt', '/media/../manage.py',
+                     '/media/posts/'):
+            with self.subTest(path=path):
+                self.assertEqual(
+                    self.get(path).status_code, HTTPStatus.NOT_FOUND,
+                )
+
+
+@override_settings(
+    STATIC_ROOT=TEMP_STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+    STATICFILES_FINDERS=[
+        'django.contrib.staticfiles.finders.FileSystemFinder',
+    ],
+)
+class CompressedStaticTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def test_collectstatic_hashes_and_compresses(self):
+        """collectstatic кладет хешированные файлы и их сжатые копии."""
+        call_command('collectstatic', '--noinput', verbosity=0)
+        css = os.listdir(os.path.join(settings.STATIC_ROOT, 'css'))
+        hashed = [name for name in css
+                  if name.startswith('bootstrap.min.')
+                  and name.endswith('.css')
+                  and name != 'bootstrap.min.css']
+        self.assertEqual(len(hashed), 1)
+        self.assertIn(f'{hashed[0]}.gz', css)
+        images = os.listdir(os.path.join(settings.STATIC_ROOT, 'img'))
+        self.assertFalse([name for name in images if name.endswith('.gz')])
+
+
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(username='HasNoName')
+        Post.objects.bulk_create(
+            Post(author=user, text=f'Пост {number}') for number in range(10)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_minify_html(self):
+        """Пробелы и комментарии убираются, кроме pre и script."""
+        html = (
+            b'<div>\n    <!-- comment -->\n    <p>a   b</p>\n</div>\n'
+            b'<pre>  x\n\n  y</pre><script>\n  var a;\n</script>'
+        )
+        self.assertEqual(
+            compression.minify_html(html),
+            b'<div>\n<p>a b</p>\n</div>\n'
+            b'<pre>  x\n\n  y</pre><script>\n  var a;\n</script>',
+        )
+
+    def test_negotiate(self):
+        """Выбирается поддерживаемое сжатие с ненулевым весом."""
+        self.assertEqual(compression.negotiate('gzip, deflate'), 'gzip')
+        self.assertIsNone(compression.negotiate('gzip;q=0, identity'))
+        self.assertIsNone(compression.negotiate(''))
+        self.assertIn(compression.negotiate('*'), compression.encodings())
+
+    def test_cached_page_served_precompressed(self):
+        """Страница сжимается при сохранении в кеш, попадание не сжимает."""
+        url = reverse('posts:index')
+        client = Client(HTTP_ACCEPT_ENCODING='gzip')
+        first = client.get(url)
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', first['Vary'])
+        self.assertTrue(first['ETag'].startswith('W/'))
+        html = gzip.decompress(first.content).decode()
+        self.assertIn('Пост 9', html)
+        self.assertNotIn('<!--', html)
+        with mock.patch.object(
+            compression, 'compress', wraps=compression.compress,
+        ) as compress:
+            second = client.get(url)
+        compress.assert_not_called()
+        self.assertEqual(second.content, first.content)
+        plain = Client().get(url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(plain.content.decode(), html)
@@ -1,6 +1,18 @@
+import os
+import stat
 from http import HTTPStatus
 
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponseNotModified, JsonResponse
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+from . import media, profiling
 
 
 def page_not_found(request, exception):
@@ -28,9 +40,62 @@ def csrf_failure(request, reason=''):
     )
 
 
+def too_many_requests(request, retry_after):
+    """Ответ сверх лимита: шаблон без base.html и запросов к базе."""
+    response = render(
+        request,
+        'core/429.html',
+        {'retry_after': retry_after},
+        status=HTTPStatus.TOO_MANY_REQUESTS,
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
 def server_error(request):
     return render(
         request,
         'core/500.html',
         status=HTTPStatus.INTERNAL_SERVER_ERROR,
     )
+
+
+@staff_member_required
+def profiling_stats(request):
+    """Сводка замеров по страницам для администраторов."""
+    return JsonResponse(
+        profiling.get_stats(),
+        json_dumps_params={'ensure_ascii': False, 'indent': 2},
+    )
+
+
+@require_safe
+def serve_media(request, path):
+    """Загруженные файлы: потоком, с Range и долгим кешированием.
+
+    Имена загрузок не переиспользуются, поэтому файл по адресу
+    не меняется и браузер может не перепроверять его.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404
+    if not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'),
+        file_stat.st_mtime,
+        file_stat.st_size,
+    ):
+        return HttpResponseNotModified()
+    last_modified = http_date(file_stat.st_mtime)
+    response = media.file_response(
+        request, full_path, file_stat.st_size, last_modified,
+    )
+    response['Last-Modified'] = last_modified
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = (
+        f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable'
+    )
+    return response
@@ -0,0 +1,107 @@
+import os
+import time
+import uuid
+
+from django.template import TemplateSyntaxError, engines
+from django.urls import (
+    NoReverseMatch, URLPattern, URLResolver, converters, get_resolver,
+    reverse,
+)
+
+# Значения для reverse по типу конвертера пути.
+DUMMY_ARGS = {
+    converters.IntConverter: 1,
+    converters.SlugConverter: 'slug',
+    converters.UUIDConverter: uuid.UUID(int=0),
+    converters.PathConverter: 'path',
+    converters.StringConverter: 'str',
+}
+
+
+def _walk(patterns, namespace=None, route_converters=None):
+    """Обходит адреса: имя с пространством имен, view и конвертеры."""
+    for pattern in patterns:
+        found = dict(route_converters or {})
+        found.update(getattr(pattern.pattern, 'converters', {}))
+        if isinstance(pattern, URLResolver):
+            nested = namespace
+            if pattern.namespace:
+                nested = ':'.join(filter(None, (namespace, pattern.namespace)))
+            yield from _walk(pattern.url_patterns, nested, found)
+        elif isinstance(pattern, URLPattern):
+            name = pattern.name
+            if name and namespace:
+                name = f'{namespace}:{name}'
+            yield name, pattern, found
+
+
+def import_views():
+    """Импортирует все view и обработчики ошибок из корневого urls."""
+    resolver = get_resolver()
+    count = 0
+    for _, pattern, _ in _walk(resolver.url_patterns):
+        pattern.callback
+        count += 1
+    for status_code in (400, 403, 404, 500):
+        resolver.resolve_error_handler(status_code)
+    return count
+
+
+def reverse_urls():
+    """Вызывает reverse для всех именованных адресов."""
+    count = 0
+    for name, _, found in _walk(get_resolver().url_patterns):
+        if not name:
+            continue
+        kwargs = {
+            key: DUMMY_ARGS.get(type(converter), 'x')
+            for key, converter in found.items()
+        }
+        try:
+            reverse(name, kwargs=kwargs)
+        except NoReverseMatch:
+            # Адреса на регулярных выражениях без конвертеров.
+            continue
+        count += 1
+    return count
+
+
+def compile_templates():
+    """Компилирует все шаблоны из папок templates проекта и приложений.
+
+    С кешируемым загрузчиком шаблоны остаются в памяти процесса.
+    """
+    count = 0
+    for engine in engines.all():
+        for directory in getattr(engine, 'template_dirs', ()):
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    name = os.path.relpath(
+                        os.path.join(root, filename), directory,
+                    ).replace(os.sep, '/')
+                    try:
+                        engine.get_template(name)
+                    except (TemplateSyntaxError, UnicodeDecodeError):
+                        continue
+                    count += 1
+    return count
+
+
+PHASES = (
+    ('imports', import_views),
+    ('urls', reverse_urls),
+    ('templates', compile_templates),
+)
+
+
+def warm_up():
+    """Прогревает процесс до первого запроса.
+
+    Возвращает по каждому этапу время в секундах и число объектов.
+    """
+    timings = {}
+    for name, phase in PHASES:
+        start = time.perf_counter()
+        count = phase()
+        timings[name] = (time.perf_counter() - start, count)
+    return timings
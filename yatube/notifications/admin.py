@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import Notification, OutboxJob
+
+
+class OutboxJobAdmin(admin.ModelAdmin):
+    """Очередь исходящих в админке."""
+    list_display = ('pk', 'kind', 'status', 'attempts', 'created')
+    list_filter = ('kind', 'status')
+
+
+class NotificationAdmin(admin.ModelAdmin):
+    """Уведомления в админке."""
+    list_display = ('pk', 'user', 'text', 'created', 'is_read')
+    list_select_related = ('user',)
+
+
+admin.site.register(OutboxJob, OutboxJobAdmin)
+admin.site.register(Notification, NotificationAdmin)
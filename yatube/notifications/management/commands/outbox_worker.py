@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications import outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма и уведомления из очереди outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Число потоков обработки.',
+        )
+        parser.add_argument(
+            '--batch', type=int, default=None,
+            help='Сколько заданий забирать из очереди за раз.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            done = outbox.run_pending(
+                workers=options['workers'],
+                batch=options['batch'],
+            )
+            if done:
+                self.stdout.write(f'Обработано заданий: {done}')
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['sleep'])
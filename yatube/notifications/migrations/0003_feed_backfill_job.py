@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxjob',
+            name='kind',
+            field=models.CharField(choices=[('email', 'Письмо'), ('notification', 'Уведомление'), ('feed_backfill', 'Рассылка постов по лентам')], max_length=20),
+        ),
+    ]
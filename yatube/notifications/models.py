@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class OutboxJob(models.Model):
+    """Задание очереди исходящих писем, уведомлений и фоновых работ.
+
+    Запись создается в той же транзакции, что и событие, а отправкой
+    занимается outbox_worker вне запроса.
+    """
+    EMAIL = 'email'
+    NOTIFICATION = 'notification'
+    FEED_BACKFILL = 'feed_backfill'
+    KINDS = (
+        (EMAIL, 'Письмо'),
+        (NOTIFICATION, 'Уведомление'),
+        (FEED_BACKFILL, 'Рассылка постов по лентам'),
+    )
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+    kind = models.CharField(max_length=20, choices=KINDS)
+    payload = models.TextField()
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ('created',)
+        indexes = [
+            models.Index(
+                name='outbox_status_created_idx',
+                fields=['status', 'created'],
+            ),
+        ]
+
+
+class Notification(models.Model):
+    """Уведомление пользователя на сайте.
+
+    Ссылка на задание очереди уникальна: повтор задания не создает
+    уведомление второй раз.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+    )
+    job = models.OneToOneField(
+        OutboxJob,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notification',
+    )
+    text = models.CharField(max_length=200)
+    url = models.CharField(max_length=200, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    is_read = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ('-created',)
+        indexes = [
+            models.Index(
+                name='notification_user_created_idx',
+                fields=['user', '-created'],
+            ),
+        ]
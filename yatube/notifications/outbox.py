@@ -0,0 +1,200 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from core import jobs as queue
+from posts import feeds
+
+from .models import Notification, OutboxJob, User
+
+
+def enqueue(kind, **payload):
+    """Кладет задание в очередь, это одна вставка в базу."""
+    return OutboxJob.objects.create(
+        kind=kind,
+        payload=json.dumps(payload, ensure_ascii=False),
+    )
+
+
+def send_mail(subject, body, to, from_email=None, html=None):
+    """Письмо уйдет из outbox_worker, а не из запроса."""
+    return enqueue(
+        OutboxJob.EMAIL,
+        subject=subject,
+        body=body,
+        to=list(to),
+        from_email=from_email,
+        html=html,
+    )
+
+
+def notify(user_id, text, url=''):
+    """Уведомление на сайте и письмо, если у пользователя есть почта."""
+    return enqueue(
+        OutboxJob.NOTIFICATION,
+        user_id=user_id,
+        text=text,
+        url=url,
+    )
+
+
+def claim(limit):
+    """Забирает задания из очереди, зависшие задания берутся повторно."""
+    return queue.claim(
+        OutboxJob,
+        limit,
+        settings.OUTBOX_JOB_TIMEOUT,
+        settings.OUTBOX_JOB_MAX_ATTEMPTS,
+    )
+
+
+def _email(payload):
+    message = EmailMultiAlternatives(
+        payload['subject'],
+        payload['body'],
+        payload['from_email'],
+        payload['to'],
+    )
+    if payload['html']:
+        message.attach_alternative(payload['html'], 'text/html')
+    return message
+
+
+def _digests(jobs):
+    """Уведомления пачки и по одному письму-сводке на пользователя.
+
+    Уведомления вставляются сразу и без повторов, поэтому ошибка
+    отправки письма не создаст их заново. Возвращает пары из заданий
+    и письма; у пользователей без почты письма нет.
+    """
+    notifications = []
+    by_user = defaultdict(list)
+    for job in jobs:
+        payload = json.loads(job.payload)
+        notifications.append(Notification(
+            user_id=payload['user_id'],
+            job_id=job.pk,
+            text=payload['text'],
+            url=payload['url'],
+        ))
+        by_user[payload['user_id']].append((job, payload))
+    with transaction.atomic():
+        Notification.objects.bulk_create(
+            notifications,
+            ignore_conflicts=True,
+        )
+    emails = dict(
+        User.objects.filter(pk__in=by_user).exclude(email='')
+        .values_list('pk', 'email')
+    )
+    deliveries = []
+    for user_id, items in by_user.items():
+        user_jobs = [job for job, _ in items]
+        if user_id not in emails:
+            deliveries.append((user_jobs, None))
+            continue
+        context = {
+            'notifications': [payload for _, payload in items],
+            'site_url': settings.SITE_URL,
+        }
+        deliveries.append((user_jobs, EmailMultiAlternatives(
+            render_to_string(
+                'notifications/email_subject.txt', context,
+            ).strip(),
+            render_to_string('notifications/email_body.txt', context),
+            to=[emails[user_id]],
+        )))
+    return deliveries
+
+
+def _finish(jobs, error=None):
+    ids = [job.pk for job in jobs]
+    if error is None:
+        OutboxJob.objects.filter(pk__in=ids).update(
+            status=OutboxJob.DONE,
+            error='',
+        )
+        return
+    failed = OutboxJob.objects.filter(pk__in=ids)
+    failed.filter(attempts__lt=settings.OUTBOX_JOB_MAX_ATTEMPTS).update(
+        status=OutboxJob.PENDING,
+        error=repr(error),
+    )
+    failed.filter(attempts__gte=settings.OUTBOX_JOB_MAX_ATTEMPTS).update(
+        status=OutboxJob.FAILED,
+        error=repr(error),
+    )
+
+
+def _emails(jobs):
+    """По письму на задание; задание с неверными данными завершается."""
+    deliveries = []
+    for job in jobs:
+        try:
+            deliveries.append(([job], _email(json.loads(job.payload))))
+        except Exception as error:
+            _finish([job], error)
+    return deliveries
+
+
+def _feed_backfills(jobs):
+    """Возобновляет рассылку постов авторов по лентам, писем нет."""
+    author_ids = {json.loads(job.payload)['author_id'] for job in jobs}
+    for author_id in author_ids:
+        feeds.resume_fanout(author_id)
+    return [(jobs, None)]
+
+
+def _deliver(connection, jobs, message):
+    """Отправляет одно письмо и сразу отмечает его задания."""
+    try:
+        if message is not None:
+            connection.open()
+            connection.send_messages([message])
+    except Exception as error:
+        _finish(jobs, error)
+    else:
+        _finish(jobs)
+
+
+def process(job_ids):
+    """Выполняет пачку заданий: письма уходят через одно соединение.
+
+    Каждое письмо отмечается отдельно, поэтому после сбоя посередине
+    пачки повторно отправятся только неотправленные.
+    """
+    jobs = list(OutboxJob.objects.filter(pk__in=job_ids))
+    groups = defaultdict(list)
+    for job in jobs:
+        groups[job.kind].append(job)
+    connection = get_connection()
+    try:
+        for kind, group in groups.items():
+            try:
+                if kind == OutboxJob.NOTIFICATION:
+                    deliveries = _digests(group)
+                elif kind == OutboxJob.FEED_BACKFILL:
+                    deliveries = _feed_backfills(group)
+                else:
+                    deliveries = _emails(group)
+            except Exception as error:
+                _finish(group, error)
+                continue
+            for delivery_jobs, message in deliveries:
+                _deliver(connection, delivery_jobs, message)
+    finally:
+        connection.close()
+    return len(jobs)
+
+
+def run_pending(workers=1, batch=None):
+    """Обрабатывает пачку заданий, возвращает число обработанных."""
+    job_ids = claim(batch or workers * 50)
+    workers = max(workers, 1)
+    chunks = [job_ids[index::workers] for index in range(workers)]
+    queue.run_in_threads(process, chunks, workers)
+    return len(job_ids)
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.urls import reverse
+
+from posts.models import Comment, Follow
+
+from . import outbox
+
+
+@receiver(post_save, sender=Comment)
+def notify_about_comment(sender, instance, created, raw=False, **kwargs):
+    if raw or not created or instance.author_id == instance.post.author_id:
+        return
+    outbox.notify(
+        instance.post.author_id,
+        f'{instance.author.username} прокомментировал ваш пост',
+        reverse('posts:post_detail', args=(instance.post_id,)),
+    )
+
+
+@receiver(post_save, sender=Follow)
+def notify_about_follower(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    outbox.notify(
+        instance.author_id,
+        f'{instance.user.username} подписался на вас',
+        reverse('posts:profile', args=(instance.user.username,)),
+    )
@@ -0,0 +1,157 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Post
+
+from . import outbox
+from .models import Notification, OutboxJob
+
+User = get_user_model()
+
+
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='password',
+        )
+        cls.reader = User.objects.create_user(username='HasNoName')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_comment_and_follow_are_queued(self):
+        """Комментарий и подписка только ставят задания в очередь."""
+        self.reader_client.post(
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            {'text': 'Комментарий'},
+        )
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=('author',)),
+        )
+        self.assertEqual(
+            OutboxJob.objects.filter(status=OutboxJob.PENDING).count(), 2,
+        )
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_worker_delivers_notifications_and_digest(self):
+        """Воркер создает уведомления и одно письмо-сводку на автора."""
+        Comment.objects.create(post=self.post, author=self.reader, text='1')
+        Follow.objects.create(user=self.reader, author=self.author)
+        call_command('outbox_worker', '--once', '--workers=1',
+                     stdout=StringIO())
+        self.assertEqual(self.author.notifications.count(), 2)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['author@example.com'])
+        self.assertIn('HasNoName подписался на вас', mail.outbox[0].body)
+        self.assertFalse(
+            OutboxJob.objects.exclude(status=OutboxJob.DONE).exists()
+        )
+
+    def test_own_comment_not_notified(self):
+        """Комментарий к своему посту не создает уведомления."""
+        Comment.objects.create(post=self.post, author=self.author, text='1')
+        self.assertFalse(OutboxJob.objects.exists())
+
+    def test_failed_job_is_retried(self):
+        """Задание с ошибкой возвращается в очередь."""
+        job = outbox.enqueue(OutboxJob.EMAIL, subject='Тема')
+        outbox.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, OutboxJob.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('KeyError', job.error)
+
+    def test_retry_after_failed_digest_not_duplicated(self):
+        """Повтор после сбоя письма не дублирует уведомления."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        with mock.patch.object(
+            EmailBackend, 'send_messages', side_effect=OSError('SMTP'),
+        ):
+            outbox.run_pending()
+        self.assertEqual(self.author.notifications.count(), 1)
+        self.assertEqual(
+            OutboxJob.objects.get().status, OutboxJob.PENDING,
+        )
+        outbox.run_pending()
+        self.assertEqual(self.author.notifications.count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_sent_emails_not_resent(self):
+        """Письма, ушедшие до сбоя, не отправляются повторно."""
+        for subject in ('Первое', 'Второе'):
+            outbox.send_mail(subject, 'Текст', ['author@example.com'])
+        with mock.patch.object(
+            EmailBackend, 'send_messages',
+            side_effect=[1, OSError('SMTP')],
+        ):
+            outbox.run_pending()
+        self.assertEqual(
+            OutboxJob.objects.filter(status=OutboxJob.DONE).count(), 1,
+        )
+        outbox.run_pending()
+        self.assertEqual(
+            [message.subject for message in mail.outbox], ['Второе'],
+        )
+
+    def test_loaddata_does_not_notify(self):
+        """Загрузка фикстур не ставит уведомления в очередь."""
+        comment = Comment(
+            post=self.post,
+            author=self.reader,
+            text='1',
+            created=timezone.now(),
+        )
+        comment.save_base(raw=True)
+        self.assertFalse(OutboxJob.objects.exists())
+
+    def test_expired_job_claimed_once(self):
+        """Зависшее задание забирает только один обработчик."""
+        job = outbox.enqueue(OutboxJob.EMAIL, subject='Тема')
+        OutboxJob.objects.filter(pk=job.pk).update(
+            status=OutboxJob.RUNNING,
+            attempts=1,
+            started=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(outbox.claim(10), [job.pk])
+        self.assertEqual(outbox.claim(10), [])
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+
+    def test_password_reset_goes_through_outbox(self):
+        """Письмо сброса пароля отправляет воркер, а не запрос."""
+        response = Client().post(
+            reverse('users:password_reset_form'),
+            {'email': 'author@example.com'},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertEqual(len(mail.outbox), 0)
+        outbox.run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['author@example.com'])
+        self.assertIn('/auth/reset/', mail.outbox[0].body)
+
+    def test_notifications_page_marks_read(self):
+        """Страница уведомлений показывает и отмечает прочитанными."""
+        Notification.objects.create(user=self.reader, text='Новое')
+        response = self.reader_client.get(reverse('notifications:index'))
+        self.assertContains(response, 'Новое')
+        self.assertFalse(
+            Notification.objects.filter(is_read=False).exists()
+        )
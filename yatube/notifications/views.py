@@ -0,0 +1,19 @@
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+
+NUM_NOTIFICATIONS = 50
+
+
+@login_required
+def index(request):
+    """Последние уведомления пользователя, непрочитанные отмечаются."""
+    notifications = list(
+        request.user.notifications.all()[:NUM_NOTIFICATIONS]
+    )
+    unread = [item.pk for item in notifications if not item.is_read]
+    if unread:
+        request.user.notifications.filter(pk__in=unread).update(is_read=True)
+    context = {
+        'notifications': notifications,
+    }
+    return render(request, 'notifications/index.html', context)
@@ -0,0 +1,184 @@
+import json
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+
+from core.ratelimit import ratelimit
+
+from . import feeds
+from .cache import (
+    cached_page,
+    conditional_page,
+    group_scopes,
+    index_scopes,
+    post_scopes,
+    profile_scopes,
+)
+from .models import Group, Post, User
+from .paginator import CursorPaginator
+
+NUM_OBJECTS_PER_PAGE = 20
+MAX_OBJECTS_PER_PAGE = 100
+EXPORT_CHUNK_SIZE = 2000
+
+# Колонки поста, которые отдает API: выборка через values()
+# не создает экземпляров моделей.
+POST_FIELDS = (
+    'id',
+    'text',
+    'pub_date',
+    'updated_at',
+    'author__username',
+    'group__slug',
+    'image',
+    'thumbnail_url',
+    'comments_count',
+)
+
+
+def serialize_post(row):
+    """Словарь поста из строки values(POST_FIELDS)."""
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'updated_at': row['updated_at'],
+        'author': row['author__username'],
+        'group': row['group__slug'],
+        'image': default_storage.url(row['image']) if row['image'] else None,
+        'thumbnail_url': row['thumbnail_url'] or None,
+        'comments_count': row['comments_count'],
+    }
+
+
+def get_per_page(request):
+    try:
+        per_page = int(request.GET.get('limit', NUM_OBJECTS_PER_PAGE))
+    except ValueError:
+        return NUM_OBJECTS_PER_PAGE
+    return min(max(per_page, 1), MAX_OBJECTS_PER_PAGE)
+
+
+def get_page(request, post_list):
+    """Страница постов по курсору, как в HTML-лентах."""
+    paginator = CursorPaginator(
+        post_list.values(*POST_FIELDS),
+        get_per_page(request),
+    )
+    page = paginator.get_page(request.GET.get('cursor'))
+    return {
+        'results': [serialize_post(row) for row in page],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    }
+
+
+def not_found(detail):
+    return JsonResponse({'detail': detail}, status=404)
+
+
+@conditional_page(index_scopes)
+@cached_page(index_scopes)
+def post_list(request):
+    """Лента всех постов."""
+    return JsonResponse(get_page(request, Post.objects.all()))
+
+
+@conditional_page(post_scopes)
+@cached_page(post_scopes)
+def post_detail(request, post_id):
+    """Отдельный пост."""
+    row = Post.objects.values(*POST_FIELDS).filter(pk=post_id).first()
+    if row is None:
+        return not_found('Пост не найден.')
+    return JsonResponse(serialize_post(row))
+
+
+@conditional_page(group_scopes)
+@cached_page(group_scopes)
+def group_posts(request, slug):
+    """Группа и ее посты."""
+    group = Group.objects.values(
+        'id', 'slug', 'title', 'description',
+    ).filter(slug=slug).first()
+    if group is None:
+        return not_found('Группа не найдена.')
+    data = get_page(request, Post.objects.filter(group=group.pop('id')))
+    data['group'] = group
+    return JsonResponse(data)
+
+
+@conditional_page(profile_scopes)
+@cached_page(profile_scopes)
+def profile(request, username):
+    """Автор, его счетчики и посты."""
+    author = User.objects.values(
+        'id',
+        'username',
+        'first_name',
+        'last_name',
+        'stats__posts_count',
+        'stats__followers_count',
+        'stats__following_count',
+    ).filter(username=username).first()
+    if author is None:
+        return not_found('Пользователь не найден.')
+    data = get_page(request, Post.objects.filter(author=author['id']))
+    data['author'] = {
+        'username': author['username'],
+        'full_name': f'{author["first_name"]} {author["last_name"]}'.strip(),
+        'posts_count': author['stats__posts_count'] or 0,
+        'followers_count': author['stats__followers_count'] or 0,
+        'following_count': author['stats__following_count'] or 0,
+    }
+    return JsonResponse(data)
+
+
+def follow_feed(request):
+    """Посты авторов, на которых подписан пользователь."""
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Требуется авторизация.'},
+            status=401,
+        )
+    return JsonResponse(get_page(request, feeds.get_timeline(request.user)))
+
+
+@ratelimit('post_export', methods=None)
+def post_export(request):
+    """Выгрузка постов в NDJSON потоком, без загрузки всех строк в память.
+
+    Доступна только вошедшим и ограничена RATELIMITS['post_export']:
+    выгрузка всей таблицы дорогая. Можно ограничить выгрузку
+    параметрами group и author.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Требуется авторизация.'},
+            status=401,
+        )
+    post_list = Post.objects.order_by('id')
+    if request.GET.get('group'):
+        post_list = post_list.filter(group__slug=request.GET['group'])
+    if request.GET.get('author'):
+        post_list = post_list.filter(
+            author__username=request.GET['author'],
+        )
+    rows = post_list.values(*POST_FIELDS).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE,
+    )
+    lines = (
+        json.dumps(
+            serialize_post(row),
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        ) + '\n'
+        for row in rows
+    )
+    response = StreamingHttpResponse(
+        lines,
+        content_type='application/x-ndjson; charset=utf-8',
+    )
+    response['Content-Disposition'] = 'attachment; filename="posts.ndjson"'
+    return response
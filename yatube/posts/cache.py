@@ -0,0 +1,257 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+
+from core import compression, db
+from core.stats import BatchedCounters
+
+from .models import Post
+
+VERSION_KEY = 'posts:version:{}'
+MODIFIED_KEY = 'posts:modified:{}'
+PAGE_KEY = 'posts:page:{}:{}:{}'
+AUTHOR_KEY = 'posts:author:{}'
+STATS_KEY = 'posts:stats:{}:{}'
+STATS_NAMES = ('page', 'post_card')
+# Эти заголовки не сохраняются вместе со страницей: длина считается
+# заново, а hop-by-hop заголовки относятся к одному соединению.
+UNCACHED_HEADERS = {
+    'connection',
+    'content-length',
+    'keep-alive',
+    'proxy-authenticate',
+    'proxy-authorization',
+    'set-cookie',
+    'te',
+    'trailer',
+    'transfer-encoding',
+    'upgrade',
+}
+
+
+def _initial_version():
+    # После вытеснения ключа версия не должна совпасть со старой.
+    return time.time_ns()
+
+
+def bump(*scopes):
+    """Инвалидирует страницы, зависящие от перечисленных областей."""
+    now = time.time()
+    for scope in scopes:
+        key = VERSION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_version(), None)
+    cache.set_many(
+        {MODIFIED_KEY.format(scope): now for scope in scopes},
+        None,
+    )
+
+
+def get_versions(scopes):
+    """Текущие версии областей, недостающие создаются."""
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        cache.add(key, _initial_version(), None)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return [versions.get(key) for key in keys]
+
+
+def get_last_modified(scopes):
+    """Время последнего изменения областей.
+
+    Если отметка вытеснена из кеша, страница считается измененной
+    сейчас.
+    """
+    keys = [MODIFIED_KEY.format(scope) for scope in scopes]
+    stamps = cache.get_many(keys)
+    now = time.time()
+    for key in keys:
+        if key not in stamps:
+            cache.add(key, now, None)
+            stamps[key] = cache.get(key, now)
+    return datetime.fromtimestamp(max(stamps.values()), timezone.utc)
+
+
+def conditional_page(scopes):
+    """Ответ 304 Not Modified без отрисовки страницы.
+
+    ETag строится из версий областей, пользователя и CSRF-cookie,
+    Last-Modified отдается только анонимам: у вошедших страница
+    зависит еще и от пользователя.
+    """
+    def etag(request, *args, **kwargs):
+        versions = get_versions(scopes(request, *args, **kwargs))
+        user_id = request.user.pk if request.user.is_authenticated else 0
+        raw = ':'.join(map(str, (
+            user_id,
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+            request.get_full_path(),
+            *versions,
+        )))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        return get_last_modified(scopes(request, *args, **kwargs))
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+_hits = BatchedCounters()
+
+
+def count_hit(name, hit):
+    """Учитывает попадание или промах кеша для мониторинга."""
+    _hits.add(STATS_KEY.format(name, 'hits' if hit else 'misses'))
+
+
+def get_stats():
+    """Число попаданий и промахов по каждому кешу."""
+    _hits.flush()
+    keys = {
+        (name, kind): STATS_KEY.format(name, kind)
+        for name in STATS_NAMES
+        for kind in ('hits', 'misses')
+    }
+    values = cache.get_many(keys.values())
+    return {
+        name: {
+            kind: values.get(keys[name, kind], 0)
+            for kind in ('hits', 'misses')
+        } for name in STATS_NAMES
+    }
+
+
+def post_author(post_id):
+    """Имя автора поста, автор поста не меняется — кешируем надолго."""
+    key = AUTHOR_KEY.format(post_id)
+    username = cache.get(key)
+    if username is None:
+        username = Post.objects.filter(pk=post_id).values_list(
+            'author__username', flat=True,
+        ).first()
+        if username is not None:
+            cache.set(key, username, None)
+    return username
+
+
+def _page_key(view, request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    return PAGE_KEY.format(view.__name__, user_id, path)
+
+
+def _replay(entry):
+    response = HttpResponse(
+        entry['content'],
+        content_type=entry['content_type'],
+        status=entry['status'],
+    )
+    for header, value in entry.get('headers', ()):
+        response[header] = value
+    # Копия уже минифицирована и сжата при сохранении.
+    response.minified = True
+    response.precompressed = entry.get('encoded')
+    return response
+
+
+def cached_page(scopes, anonymous_only=False):
+    """Кеширует страницу до изменения данных, от которых она зависит.
+
+    scopes(request, *args, **kwargs) возвращает список областей,
+    версии которых повышаются сигналами. Если версия устарела,
+    страницу пересобирает только один обработчик, остальные
+    в это время отдают устаревшую копию. Копия собирается по основной
+    базе: отстающая реплика сохранила бы под новой версией старые
+    данные до следующего изменения.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or (
+                anonymous_only and request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            versions = get_versions(scopes(request, *args, **kwargs))
+            key = _page_key(view, request)
+            entry = cache.get(key)
+            if entry is not None and entry['versions'] == versions:
+                count_hit('page', True)
+                return _replay(entry)
+            count_hit('page', False)
+            lock_key = f'{key}:lock'
+            locked = cache.add(
+                lock_key, 1, settings.PAGE_CACHE_LOCK_TIMEOUT,
+            )
+            if entry is not None and not locked:
+                return _replay(entry)
+            try:
+                with db.replica_reads(False):
+                    response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.streaming:
+                    compression.minify_response(response)
+                    response.precompressed = compression.encode_all(
+                        response.content,
+                    )
+                    cache.set(key, {
+                        'versions': versions,
+                        'content': response.content,
+                        'encoded': response.precompressed,
+                        'content_type': response['Content-Type'],
+                        'status': response.status_code,
+                        'headers': [
+                            (header, value)
+                            for header, value in response.items()
+                            if header.lower() not in UNCACHED_HEADERS
+                        ],
+                    }, settings.PAGE_CACHE_TIMEOUT)
+            finally:
+                if locked:
+                    cache.delete(lock_key)
+            return response
+        return wrapper
+    return decorator
+
+
+def _followee_scopes(request):
+    # Ленты отмечают авторов, на которых подписан пользователь.
+    if request.user.is_authenticated:
+        return [f'followees:{request.user.pk}']
+    return []
+
+
+def index_scopes(request):
+    return ['posts', 'groups', 'trending', *_followee_scopes(request)]
+
+
+def group_scopes(request, slug):
+    return [
+        f'group:{slug}',
+        'groups',
+        'trending',
+        *_followee_scopes(request),
+    ]
+
+
+def profile_scopes(request, username):
+    return [f'author:{username}', 'groups']
+
+
+def post_scopes(request, post_id):
+    return [
+        f'post:{post_id}',
+        f'author:{post_author(post_id)}',
+        'groups',
+    ]
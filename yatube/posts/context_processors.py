@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from . import follows
+
+
+def followee_ids(request):
+    """Id авторов, на которых подписан пользователь.
+
+    Читается из кеша только если шаблон обратился к переменной.
+    """
+    return {
+        'followee_ids': SimpleLazyObject(
+            lambda: follows.get_followee_ids(request.user)
+        ),
+    }
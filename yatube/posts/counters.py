@@ -0,0 +1,83 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Post, User, UserStats
+
+
+def get_stats(user):
+    """Счетчики пользователя, без записи в базе — нулевые."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return UserStats(user=user)
+
+
+def change_user(user_id, **deltas):
+    """Атомарно изменяет счетчики пользователя на заданные величины.
+
+    Счетчик не опускается ниже нуля, даже если разошелся с данными.
+    """
+    changes = {
+        field: Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+    }
+    if UserStats.objects.filter(user_id=user_id).update(**changes):
+        return
+    if any(delta < 0 for delta in deltas.values()):
+        return
+    try:
+        with transaction.atomic():
+            UserStats.objects.create(user_id=user_id, **deltas)
+    except IntegrityError:
+        UserStats.objects.filter(user_id=user_id).update(**changes)
+
+
+def change_post(post_id, delta):
+    """Атомарно изменяет счетчик комментариев поста."""
+    Post.objects.filter(pk=post_id).update(
+        comments_count=Greatest(F('comments_count') + delta, 0),
+    )
+
+
+def _count(queryset, field):
+    return Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+            field,
+        ).annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField(),
+    )
+
+
+def recount():
+    """Пересчитывает все счетчики по данным в базе."""
+    UserStats.objects.bulk_create(
+        [
+            UserStats(user_id=user_id) for user_id in User.objects.filter(
+                stats__isnull=True,
+            ).values_list('pk', flat=True).iterator()
+        ],
+        ignore_conflicts=True,
+    )
+    users = User.objects.annotate(
+        posts_total=Coalesce(_count(Post.objects, 'author'), 0),
+        followers_total=Coalesce(_count(Follow.objects, 'author'), 0),
+        following_total=Coalesce(_count(Follow.objects, 'user'), 0),
+    )
+    fixed = 0
+    for user in users.filter(stats__isnull=False).exclude(
+        stats__posts_count=F('posts_total'),
+        stats__followers_count=F('followers_total'),
+        stats__following_count=F('following_total'),
+    ).iterator():
+        fixed += UserStats.objects.filter(user_id=user.pk).update(
+            posts_count=user.posts_total,
+            followers_count=user.followers_total,
+            following_count=user.following_total,
+        )
+    fixed += Post.objects.exclude(
+        comments_count=Coalesce(_count(Comment.objects, 'post'), 0),
+    ).update(
+        comments_count=Coalesce(_count(Comment.objects, 'post'), 0),
+    )
+    return fixed
@@ -0,0 +1,179 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from notifications import outbox
+from notifications.models import OutboxJob
+
+from .models import FeedEntry, Follow, Post, UserStats
+
+BATCH_SIZE = 1000
+
+
+def is_prolific(author_id) -> bool:
+    """Автор слишком популярен для рассылки постов по лентам."""
+    return UserStats.objects.filter(
+        user_id=author_id,
+        fanout_paused=True,
+    ).exists()
+
+
+def prolific_followees(user):
+    """Популярные авторы из подписок, их посты читаются напрямую."""
+    return list(Follow.objects.filter(
+        user=user,
+        author__stats__fanout_paused=True,
+    ).values_list('author_id', flat=True))
+
+
+def _entries_for_posts(user_id, posts):
+    return [
+        FeedEntry(
+            user_id=user_id,
+            post_id=post_id,
+            author_id=author_id,
+            pub_date=pub_date,
+        ) for post_id, author_id, pub_date in posts
+    ]
+
+
+def fan_out(post):
+    """Добавляет новый пост в ленты подписчиков автора."""
+    if is_prolific(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id,
+    ).values_list('user_id', flat=True)
+    entries = [
+        FeedEntry(
+            user_id=user_id,
+            post=post,
+            author_id=post.author_id,
+            pub_date=post.pub_date,
+        ) for user_id in followers.iterator()
+    ]
+    FeedEntry.objects.bulk_create(
+        entries,
+        ignore_conflicts=True,
+    )
+
+
+def backfill(user, author):
+    """Заполняет ленту постами автора после подписки."""
+    if is_prolific(author.pk):
+        return
+    posts = Post.objects.filter(author=author).values_list(
+        'pk', 'author_id', 'pub_date',
+    )
+    FeedEntry.objects.bulk_create(
+        _entries_for_posts(user.pk, posts.iterator()),
+        ignore_conflicts=True,
+    )
+
+
+def backfill_followers(author_id):
+    """Рассылает все посты автора по лентам его подписчиков."""
+    posts = list(Post.objects.filter(author_id=author_id).values_list(
+        'pk', 'author_id', 'pub_date',
+    ))
+    followers = Follow.objects.filter(
+        author_id=author_id,
+    ).values_list('user_id', flat=True)
+    batch = []
+    for user_id in followers.iterator():
+        batch.extend(_entries_for_posts(user_id, posts))
+        if len(batch) >= BATCH_SIZE:
+            FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def follower_added(author_id):
+    """Рассылка постов автора приостанавливается, когда он стал популярным.
+
+    Уже разосланные записи остаются, новые посты get_timeline читает
+    напрямую.
+    """
+    UserStats.objects.filter(
+        user_id=author_id,
+        fanout_paused=False,
+        followers_count__gt=settings.FEED_FANOUT_MAX_FOLLOWERS,
+    ).update(fanout_paused=True)
+
+
+def follower_removed(author_id):
+    """Ставит в очередь возобновление рассылки, если подписчиков мало.
+
+    Посты, написанные, пока рассылка стояла, надо разослать всем
+    подписчикам, а это слишком долго для запроса отписки. До этого
+    get_timeline продолжает читать их напрямую.
+    """
+    resumable = UserStats.objects.filter(
+        user_id=author_id,
+        fanout_paused=True,
+        followers_count__lte=settings.FEED_FANOUT_RESUME_FOLLOWERS,
+    ).exists()
+    if resumable:
+        outbox.enqueue(OutboxJob.FEED_BACKFILL, author_id=author_id)
+
+
+def resume_fanout(author_id):
+    """Возобновляет рассылку и досылает посты автора по лентам.
+
+    Выполняется из outbox_worker. Флаг снимается в одной транзакции
+    с досылкой, поэтому посты автора не пропадают из лент.
+    """
+    with transaction.atomic():
+        resumed = UserStats.objects.filter(
+            user_id=author_id,
+            fanout_paused=True,
+            followers_count__lte=settings.FEED_FANOUT_RESUME_FOLLOWERS,
+        ).update(fanout_paused=False)
+        if resumed:
+            backfill_followers(author_id)
+
+
+def prune(user, author):
+    """Убирает посты автора из ленты после отписки."""
+    FeedEntry.objects.filter(user=user, author=author).delete()
+
+
+def get_timeline(user):
+    """Посты ленты подписок пользователя."""
+    query = Q(pk__in=FeedEntry.objects.filter(user=user).values('post_id'))
+    prolific = prolific_followees(user)
+    if prolific:
+        query |= Q(author_id__in=prolific)
+    return Post.objects.filter(query)
+
+
+def rebuild_all():
+    """Пересобирает все ленты с нуля, возвращает число записей."""
+    FeedEntry.objects.all().delete()
+    popular = Q(followers_count__gt=settings.FEED_FANOUT_MAX_FOLLOWERS)
+    UserStats.objects.filter(popular).update(fanout_paused=True)
+    UserStats.objects.exclude(popular).update(fanout_paused=False)
+    prolific = UserStats.objects.filter(
+        fanout_paused=True,
+    ).values('user_id')
+    follows = Follow.objects.exclude(author__in=prolific).values_list(
+        'user_id', 'author_id',
+    ).order_by('author_id')
+    total = 0
+    batch = []
+    posts_cache = {}
+    for user_id, author_id in follows.iterator():
+        if author_id not in posts_cache:
+            posts_cache.clear()
+            posts_cache[author_id] = list(
+                Post.objects.filter(author_id=author_id).values_list(
+                    'pk', 'author_id', 'pub_date',
+                )
+            )
+        batch.extend(_entries_for_posts(user_id, posts_cache[author_id]))
+        if len(batch) >= BATCH_SIZE:
+            FeedEntry.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    FeedEntry.objects.bulk_create(batch)
+    return total + len(batch)
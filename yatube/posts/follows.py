@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models.signals import post_delete, post_save
+
+from .models import Follow
+
+FOLLOWEES_KEY = 'posts:followees:{}'
+
+
+def get_followee_ids(user):
+    """Множество id авторов, на которых подписан пользователь.
+
+    Хранится в кеше до изменения подписок пользователя.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    key = FOLLOWEES_KEY.format(user.pk)
+    followee_ids = cache.get(key)
+    if followee_ids is None:
+        followee_ids = frozenset(Follow.objects.filter(
+            user_id=user.pk,
+        ).values_list('author_id', flat=True))
+        cache.set(key, followee_ids, None)
+    return followee_ids
+
+
+def forget(user_id):
+    cache.delete(FOLLOWEES_KEY.format(user_id))
+
+
+def _names(ops):
+    """Имена таблицы подписок и ее колонок user и author для SQL."""
+    meta = Follow._meta
+    return [ops.quote_name(meta.db_table)] + [
+        ops.quote_name(meta.get_field(name).column)
+        for name in ('user', 'author')
+    ]
+
+
+def follow(user, author):
+    """Подписка одной вставкой без предварительной проверки.
+
+    Повторная подписка ничего не меняет. Сигналы отправляются
+    вручную и только если запись действительно добавлена, это видно
+    по rowcount на любой базе. id новой записи берется из lastrowid
+    только в SQLite, где INSERT OR IGNORE выставляет его лишь при
+    вставке; на других базах запись перечитывается.
+    Возвращает True, если подписка создана.
+    """
+    using = router.db_for_write(Follow)
+    connection = connections[using]
+    ops = connection.ops
+    table, user_column, author_column = _names(ops)
+    sql = (
+        f'{ops.insert_statement(ignore_conflicts=True)} {table} '
+        f'({user_column}, {author_column}) VALUES (%s, %s) '
+        f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (user.pk, author.pk))
+        if cursor.rowcount != 1:
+            return False
+        pk = cursor.lastrowid if connection.vendor == 'sqlite' else None
+    if pk is None:
+        pk = Follow.objects.using(using).values_list('pk', flat=True).get(
+            user=user, author=author,
+        )
+    instance = Follow(pk=pk, user=user, author=author)
+    instance._state.adding = False
+    instance._state.db = using
+    post_save.send(
+        sender=Follow,
+        instance=instance,
+        created=True,
+        update_fields=None,
+        raw=False,
+        using=using,
+    )
+    return True
+
+
+def unfollow(user, author):
+    """Отписка одним DELETE, повторная отписка ничего не меняет.
+
+    Возвращает True, если подписка была удалена.
+    """
+    using = router.db_for_write(Follow)
+    table, user_column, author_column = _names(connections[using].ops)
+    sql = (
+        f'DELETE FROM {table} '
+        f'WHERE {user_column} = %s AND {author_column} = %s'
+    )
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, (user.pk, author.pk))
+        if not cursor.rowcount:
+            return False
+    instance = Follow(user=user, author=author)
+    instance._state.db = using
+    post_delete.send(sender=Follow, instance=instance, using=using)
+    return True
@@ -1,6 +1,19 @@
 from django import forms
 
-from .models import Post, Comment
+from . import images
+from .models import Group, Post, Comment
+
+
+class PostImageField(forms.ImageField):
+    """Картинка проверяется по размеру и заголовку до декодирования."""
+
+    def to_python(self, data):
+        upload = forms.FileField.to_python(self, data)
+        if upload is None:
+            return None
+        upload.image = images.inspect(upload)
+        upload.content_type = upload.image.get_format_mimetype()
+        return upload
 
 
 class PostForm(forms.ModelForm):
@@ -17,6 +30,9 @@ class PostForm(forms.ModelForm):
             'text': ('Здесь должен быть текст поста.'),
             'group': ('Выберете группу.'),
         }
+        field_classes = {
+            'image': PostImageField,
+        }
 
     def clean_text(self):
         data = self.cleaned_data['text']
@@ -26,6 +42,27 @@ class PostForm(forms.ModelForm):
 
         return data
 
+    def clean_image(self):
+        """Новая картинка уменьшается и пересохраняется без метаданных."""
+        data = self.cleaned_data['image']
+        self.image_size = None
+        if hasattr(data, 'image'):
+            data, width, height = images.process(data.image, data.name)
+            self.image_size = (width, height, data.size)
+        return data
+
+    def save(self, commit=True):
+        post = super().save(commit=False)
+        if self.image_size:
+            (post.image_width, post.image_height,
+             post.image_bytes) = self.image_size
+        elif not post.image:
+            post.image_width = post.image_height = post.image_bytes = None
+        if commit:
+            post.save()
+            self.save_m2m()
+        return post
+
 
 class CommentForm(forms.ModelForm):
     """Форма добавления комментария."""
@@ -41,3 +78,23 @@ class CommentForm(forms.ModelForm):
             raise forms.ValidationError('Поле не должно быть пустым')
 
         return data
+
+
+class SearchForm(forms.Form):
+    """Форма поиска по постам."""
+    q = forms.CharField(
+        label='Запрос',
+        max_length=200,
+        help_text='Для поиска по началу слова добавьте *, например: пит*',
+    )
+    group = forms.ModelChoiceField(
+        label='Группа',
+        queryset=Group.objects.all(),
+        to_field_name='slug',
+        required=False,
+    )
+    author = forms.CharField(
+        label='Автор',
+        max_length=150,
+        required=False,
+    )
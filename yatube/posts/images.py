@@ -0,0 +1,81 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Параметры сохранения по форматам: метаданные не переносятся.
+SAVE_OPTIONS = {
+    'JPEG': lambda: {'quality': settings.POST_IMAGE_QUALITY,
+                     'optimize': True, 'progressive': True},
+    'PNG': lambda: {'optimize': True},
+    'WEBP': lambda: {'quality': settings.POST_IMAGE_QUALITY},
+    'GIF': lambda: {'optimize': True},
+}
+
+
+def inspect(upload):
+    """Проверяет загрузку по размеру и заголовку, не декодируя картинку.
+
+    Возвращает открытое, но еще не декодированное изображение.
+    """
+    limit = settings.POST_IMAGE_MAX_UPLOAD_SIZE
+    if upload.size > limit:
+        raise ValidationError(
+            f'Файл больше {limit // (1024 * 1024)} МБ.',
+            code='file_too_large',
+        )
+    upload.seek(0)
+    try:
+        # Image.open читает только заголовок.
+        image = Image.open(upload)
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError(
+            'Загрузите правильное изображение.',
+            code='invalid_image',
+        )
+    if image.format not in SAVE_OPTIONS:
+        raise ValidationError(
+            f'Формат {image.format} не поддерживается.',
+            code='invalid_format',
+        )
+    width, height = image.size
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            f'Слишком большое изображение: {width}×{height}.',
+            code='too_many_pixels',
+        )
+    return image
+
+
+def process(image, name):
+    """Уменьшает картинку и пересохраняет ее без метаданных.
+
+    Возвращает файл для ImageField, ширину и высоту. Оборванный или
+    поврежденный файл, который прошел проверку заголовка, отклоняется
+    с ValidationError.
+    """
+    try:
+        return _reencode(image, name)
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        raise ValidationError(
+            'Загрузите правильное изображение.',
+            code='invalid_image',
+        )
+
+
+def _reencode(image, name):
+    fmt = image.format
+    max_side = settings.POST_IMAGE_MAX_SIDE
+    if fmt == 'JPEG':
+        # JPEG декодируется сразу в уменьшенном масштабе.
+        image.draft('RGB', (max_side, max_side))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    output = BytesIO()
+    image.save(output, fmt, **SAVE_OPTIONS[fmt]())
+    width, height = image.size
+    return ContentFile(output.getvalue(), name=name), width, height
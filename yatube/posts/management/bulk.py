@@ -0,0 +1,73 @@
+import csv
+import json
+from contextlib import contextmanager
+from itertools import islice
+
+from django.utils.dateparse import parse_datetime
+
+# Колонки файла выгрузки постов, автор и группа — по имени и слагу.
+POST_COLUMNS = ('text', 'pub_date', 'author', 'group', 'image')
+FORMATS = ('ndjson', 'csv')
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Позволяет задать даты полям с auto_now/auto_now_add."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def batched(iterable, size):
+    """Делит поток на списки не длиннее size."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def guess_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'csv' if str(path).lower().endswith('.csv') else 'ndjson'
+
+
+def write_rows(file, rows, fmt):
+    """Пишет словари POST_COLUMNS построчно, возвращает их число."""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(file, POST_COLUMNS)
+        writer.writeheader()
+    for row in rows:
+        # isoformat сохраняет микросекунды, в отличие от DjangoJSONEncoder.
+        row['pub_date'] = row['pub_date'].isoformat()
+        if fmt == 'csv':
+            writer.writerow(row)
+        else:
+            file.write(json.dumps(row, ensure_ascii=False))
+            file.write('\n')
+        count += 1
+    return count
+
+
+def read_rows(file, fmt):
+    """Читает файл выгрузки построчно, не загружая его целиком."""
+    if fmt == 'csv':
+        rows = csv.DictReader(file)
+    else:
+        rows = (json.loads(line) for line in file if line.strip())
+    for row in rows:
+        yield {
+            'text': row['text'],
+            'pub_date': parse_datetime(row['pub_date']),
+            'author': row['author'],
+            'group': row.get('group') or None,
+            'image': row.get('image') or '',
+        }
@@ -0,0 +1,164 @@
+import json
+import math
+import subprocess
+import time
+from statistics import mean
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from posts import api_urls, urls
+from posts.management.samples import sample_urls
+
+PERCENTILES = (50, 95, 99)
+# Эти страницы доступны без входа и измеряются анонимно.
+PUBLIC_VIEWS = {
+    'index',
+    'group_list',
+    'profile',
+    'post_detail',
+    'post_comments',
+    'search',
+    'post_list',
+    'group_posts',
+}
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет все страницы posts через тестовый клиент и сообщает '
+        'p50/p95/p99 времени ответа и число SQL-запросов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кеш перед каждым запросом.',
+        )
+        parser.add_argument(
+            '--include-writes', action='store_true',
+            help='Также вызывать страницы, меняющие данные.',
+        )
+        parser.add_argument(
+            '--api', action='store_true',
+            help='Измерять JSON API вместо HTML-страниц.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Сохранить результаты в JSON-файл.',
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON-файл прошлого прогона для сравнения.',
+        )
+
+    def handle(self, *args, **options):
+        user, pages = sample_urls(
+            options['include_writes'],
+            api_urls if options['api'] else urls,
+        )
+        if not pages:
+            raise CommandError(
+                'Нет постов: заполните базу, например seed_data.'
+            )
+        guest = Client()
+        authorized = Client()
+        results = {}
+        # Все запросы выполняются в транзакции, которая откатывается,
+        # и без ограничения частоты, иначе записи быстро упрутся в 429.
+        with transaction.atomic(), override_settings(RATELIMITS={}):
+            authorized.force_login(user)
+            for name, url, params, pattern in pages:
+                client = guest if pattern.name in PUBLIC_VIEWS else authorized
+                results[name] = self.measure(
+                    client, pattern.name, url, params, options,
+                )
+            transaction.set_rollback(True)
+        report = {
+            'commit': current_commit(),
+            'created': timezone.now().isoformat(),
+            'settings': settings.SETTINGS_MODULE,
+            'iterations': options['iterations'],
+            'cold': options['cold'],
+            'api': options['api'],
+            'results': results,
+        }
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)['results']
+        self.print_report(results, baseline)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def measure(self, client, view, url, params, options):
+        request = client.get
+        if view == 'add_comment':
+            request = client.post
+            params = {'text': 'Комментарий из бенчмарка'}
+        for _ in range(options['warmup']):
+            request(url, params)
+        timings = []
+        queries = []
+        status = None
+        for _ in range(options['iterations']):
+            if options['cold']:
+                cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = request(url, params)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(context))
+            status = response.status_code
+        result = {
+            'url': url,
+            'status': status,
+            'mean_ms': round(mean(timings), 3),
+            'queries_mean': round(mean(queries), 2),
+            'queries_max': max(queries),
+        }
+        for percent in PERCENTILES:
+            result[f'p{percent}_ms'] = round(percentile(timings, percent), 3)
+        return result
+
+    def print_report(self, results, baseline):
+        header = f'{"страница":<24}{"p50":>9}{"p95":>9}{"p99":>9}{"SQL":>7}'
+        self.stdout.write(header)
+        for name, result in results.items():
+            line = (
+                f'{name:<24}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}'
+                f'{result["p99_ms"]:>9.2f}{result["queries_mean"]:>7.1f}'
+            )
+            if baseline and name in baseline:
+                before = baseline[name]['p50_ms']
+                if before:
+                    change = (result['p50_ms'] - before) / before * 100
+                    line += f'  p50 {change:+.1f}%'
+            self.stdout.write(line)
@@ -0,0 +1,19 @@
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from posts.cache import get_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит число попаданий и промахов кеша страниц и карточек, '
+        'а для двухуровневого кеша — по каждому уровню.'
+    )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        if hasattr(cache, 'get_tier_stats'):
+            stats['tiers'] = cache.get_tier_stats()
+        self.stdout.write(json.dumps(stats, indent=2))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает популярные посты и активные группы по счетчикам '
+        'активности и удаляет устаревшие интервалы. Запускается '
+        'периодически, например из cron раз в несколько минут.'
+    )
+
+    def handle(self, *args, **options):
+        deleted = trending.compact()
+        result = trending.get_trending()
+        self.stdout.write(
+            f'Постов: {len(result["posts"])}, групп: '
+            f'{len(result["groups"])}, удалено интервалов: {deleted}'
+        )
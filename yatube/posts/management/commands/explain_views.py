@@ -0,0 +1,85 @@
+import inspect
+
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.urls import resolve
+
+from posts.management.samples import sample_urls
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN QUERY PLAN для запросов каждой страницы posts '
+        'и сообщает о полных просмотрах таблиц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-scan', action='store_true',
+            help='Завершиться с ошибкой, если найден полный просмотр.',
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Печатать планы всех запросов.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN доступен только в SQLite.')
+        user, pages = sample_urls()
+        if not pages:
+            raise CommandError(
+                'Нет постов: заполните базу, например seed_data.'
+            )
+        scans = 0
+        for name, url, params, pattern in pages:
+            queries = self.capture(url, params, pattern, user)
+            self.stdout.write(f'{name}: запросов {len(queries)}')
+            for sql, sql_params in queries:
+                plan = self.explain(sql, sql_params)
+                flagged = [line for line in plan if self.is_scan(line)]
+                scans += len(flagged)
+                if flagged or options['verbose_plans']:
+                    self.stdout.write(f'  {sql}')
+                    for line in plan:
+                        mark = '!!' if line in flagged else '  '
+                        self.stdout.write(f'    {mark} {line}')
+        if scans and options['fail_on_scan']:
+            raise CommandError(f'Найдено полных просмотров: {scans}')
+        style = self.style.WARNING if scans else self.style.SUCCESS
+        self.stdout.write(style(f'Полных просмотров: {scans}'))
+
+    def capture(self, url, params, pattern, user):
+        request = RequestFactory().get(url, params)
+        request.user = user
+        request.session = SessionBase()
+        view = inspect.unwrap(pattern.callback)
+        kwargs = resolve(url).kwargs
+        queries = []
+
+        def collect(execute, sql, params, many, context):
+            queries.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with transaction.atomic():
+            with connection.execute_wrapper(collect):
+                view(request, **kwargs)
+            transaction.set_rollback(True)
+        return [
+            (sql, params) for sql, params in queries
+            if sql.lstrip().upper().startswith('SELECT')
+        ]
+
+    @staticmethod
+    def explain(sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    @staticmethod
+    def is_scan(line):
+        if line.startswith('SCAN'):
+            return 'USING' not in line and 'VIRTUAL TABLE' not in line
+        return 'TEMP B-TREE' in line
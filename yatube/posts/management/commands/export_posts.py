@@ -0,0 +1,80 @@
+import os
+import shutil
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from posts.management.bulk import FORMATS, guess_format, write_rows
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты в NDJSON или CSV потоком, '
+        'картинки копируются в отдельный каталог.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            help='Файл выгрузки, "-" — стандартный вывод.',
+        )
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument(
+            '--images',
+            help='Каталог, куда скопировать картинки постов.',
+        )
+        parser.add_argument('--author', help='Только посты автора.')
+        parser.add_argument('--group', help='Только посты группы (слаг).')
+
+    def handle(self, *args, **options):
+        post_list = Post.objects.order_by('id')
+        if options['author']:
+            post_list = post_list.filter(author__username=options['author'])
+        if options['group']:
+            post_list = post_list.filter(group__slug=options['group'])
+        rows = self.rows(post_list, options['chunk_size'], options['images'])
+        fmt = guess_format(options['output'], options['format'])
+        started = time.monotonic()
+        report = self.stdout
+        if options['output'] == '-':
+            # Выгрузка идет в stdout, отчет — в stderr.
+            report = self.stderr
+            self.stdout.ending = ''
+            total = write_rows(self.stdout, rows, fmt)
+        else:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as file:
+                total = write_rows(file, rows, fmt)
+        elapsed = time.monotonic() - started
+        report.write(
+            f'Выгружено постов: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-6):.0f} строк/с)'
+        )
+
+    def rows(self, post_list, chunk_size, images):
+        columns = post_list.values(
+            'text', 'pub_date', 'author__username', 'group__slug', 'image',
+        )
+        for row in columns.iterator(chunk_size=chunk_size):
+            if images and row['image']:
+                self.copy_image(row['image'], images)
+            yield {
+                'text': row['text'],
+                'pub_date': row['pub_date'],
+                'author': row['author__username'],
+                'group': row['group__slug'] or '',
+                'image': row['image'],
+            }
+
+    def copy_image(self, name, directory):
+        target = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            with default_storage.open(name) as source, \
+                    open(target, 'wb') as destination:
+                shutil.copyfileobj(source, destination)
+        except FileNotFoundError:
+            self.stderr.write(f'Нет файла картинки: {name}')
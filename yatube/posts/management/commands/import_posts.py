@@ -0,0 +1,144 @@
+import os
+import time
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from posts import images, thumbnails
+from posts.management.bulk import (
+    FORMATS,
+    batched,
+    explicit_dates,
+    guess_format,
+    read_rows,
+)
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из NDJSON или CSV, сделанного export_posts, '
+        'пачками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Файл выгрузки.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--images',
+            help='Каталог с картинками, сохраненными export_posts.',
+        )
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать неизвестных авторов и группы, иначе '
+                 'такие посты пропускаются.',
+        )
+        parser.add_argument(
+            '--skip-post-process', action='store_true',
+            help='Не пересчитывать счетчики, ленты и поисковый индекс.',
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options['input']):
+            raise CommandError(f'Нет файла {options["input"]}')
+        self.images = options['images']
+        self.create_missing = options['create_missing']
+        self.skipped = 0
+        # Все авторы и группы в памяти: без запроса на каждую строку.
+        self.authors = dict(User.objects.values_list('username', 'id'))
+        self.groups = dict(Group.objects.values_list('slug', 'id'))
+        fmt = guess_format(options['input'], options['format'])
+        fields = [Post._meta.get_field(name)
+                  for name in ('pub_date', 'updated_at')]
+        started = time.monotonic()
+        total = 0
+        with open(options['input'], encoding='utf-8', newline='') as file, \
+                explicit_dates(*fields):
+            posts = self.posts(read_rows(file, fmt))
+            for batch in batched(posts, options['batch_size']):
+                with transaction.atomic():
+                    Post.objects.bulk_create(batch)
+                total += len(batch)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Загружено постов: {total}')
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Загружено постов: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-6):.0f} строк/с), '
+            f'пропущено: {self.skipped}'
+        )
+        # bulk_create не отправляет сигналы, поэтому производные
+        # данные пересчитываются целиком.
+        if total and not options['skip_post_process']:
+            for command in ('recount', 'rebuild_timelines',
+                            'rebuild_search_index'):
+                call_command(command, stdout=StringIO())
+            thumbnails.enqueue_missing()
+        cache.clear()
+
+    def posts(self, rows):
+        for row in rows:
+            author_id = self.author_id(row['author'])
+            group_id = self.group_id(row['group'])
+            if author_id is None or (row['group'] and group_id is None):
+                self.skipped += 1
+                continue
+            pub_date = row['pub_date'] or timezone.now()
+            yield Post(
+                author_id=author_id,
+                group_id=group_id,
+                text=row['text'],
+                pub_date=pub_date,
+                updated_at=pub_date,
+                **self.copy_image(row['image']),
+            )
+
+    def author_id(self, username):
+        if username not in self.authors and self.create_missing:
+            self.authors[username] = User.objects.create_user(username).pk
+        return self.authors.get(username)
+
+    def group_id(self, slug):
+        if not slug:
+            return None
+        if slug not in self.groups and self.create_missing:
+            self.groups[slug] = Group.objects.create(
+                title=slug,
+                slug=slug,
+                description='',
+            ).pk
+        return self.groups.get(slug)
+
+    def copy_image(self, name):
+        """Картинка проходит ту же обработку, что и загрузка на сайте.
+
+        Возвращает поля поста с картинкой и ее размерами.
+        """
+        if not name or not self.images:
+            return {}
+        path = os.path.join(self.images, name)
+        if not os.path.exists(path):
+            self.stderr.write(f'Нет файла картинки: {name}')
+            return {}
+        try:
+            with open(path, 'rb') as file:
+                content, width, height = images.process(
+                    images.inspect(File(file)), name,
+                )
+        except ValidationError as error:
+            self.stderr.write(f'Картинка {name} пропущена: {error.message}')
+            return {}
+        return {
+            'image': default_storage.save(name, content),
+            'image_width': width,
+            'image_height': height,
+            'image_bytes': content.size,
+        }
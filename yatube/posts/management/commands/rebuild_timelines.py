@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import feeds
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает ленты подписок всех пользователей с нуля.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = feeds.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Лента пересобрана, записей: {total}'
+        ))
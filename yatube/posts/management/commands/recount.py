@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики постов, комментариев и подписок.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = counters.recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'Счетчики пересчитаны, исправлено записей: {fixed}'
+        ))
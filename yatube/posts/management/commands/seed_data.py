@@ -0,0 +1,223 @@
+import random
+import time
+from bisect import bisect
+from datetime import timedelta
+from io import StringIO
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.management.bulk import explicit_dates
+from posts.models import Comment, Follow, Group, Post, User
+
+TEXT_POOL_SIZE = 2000
+
+
+class PowerLaw:
+    """Выбор индекса с весами по распределению Парето."""
+
+    def __init__(self, size, alpha, rng):
+        self.rng = rng
+        self.cum_weights = list(accumulate(
+            rng.paretovariate(alpha) for _ in range(size)
+        ))
+        self.total = self.cum_weights[-1]
+
+    def choice(self):
+        return bisect(self.cum_weights, self.rng.random() * self.total)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу тестовыми данными: пользователи, группы, посты, '
+        'комментарии и подписки со степенным распределением.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя.',
+        )
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Показатель степенного распределения активности.',
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имен пользователей и слагов групп.',
+        )
+        parser.add_argument(
+            '--skip-post-process', action='store_true',
+            help='Не пересчитывать счетчики, ленты и поисковый индекс.',
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError('Нужно хотя бы два пользователя.')
+        self.rng = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        if options['seed'] is not None:
+            self.fake.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.days = options['days']
+        self.texts = [
+            self.fake.paragraph(nb_sentences=4)
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+        prefix = options['prefix']
+
+        user_ids = self.timed('Пользователи', self.create_users,
+                              prefix, options['users'])
+        group_ids = self.timed('Группы', self.create_groups,
+                               prefix, options['groups'])
+        authors = PowerLaw(len(user_ids), options['alpha'], self.rng)
+        post_ids = self.timed('Посты', self.create_posts, user_ids,
+                              group_ids, authors, options['posts'])
+        self.timed('Подписки', self.create_follows, user_ids, authors,
+                   options['follows'])
+        self.timed('Комментарии', self.create_comments, user_ids, post_ids,
+                   options['alpha'], options['comments'])
+        if not options['skip_post_process']:
+            for command in ('recount', 'rebuild_timelines',
+                            'rebuild_search_index'):
+                self.timed(command, call_command, command, stdout=StringIO())
+        cache.clear()
+
+    def timed(self, label, func, *args, **kwargs):
+        started = time.monotonic()
+        result = func(*args, **kwargs)
+        elapsed = time.monotonic() - started
+        count = len(result) if isinstance(result, (list, range)) else ''
+        self.stdout.write(f'{label}: {count} за {elapsed:.1f} с')
+        return result
+
+    def random_date(self):
+        return self.now - timedelta(seconds=self.rng.randrange(
+            self.days * 24 * 60 * 60,
+        ))
+
+    def insert(self, model, objects):
+        """Вставляет объекты пачками, возвращает список новых id.
+
+        После каждой пачки id перечитываются из базы: они не обязаны
+        идти подряд после наибольшего, если строки удаляли или
+        в таблицу пишет кто-то еще.
+        """
+        last = model.objects.order_by('-pk').values_list('pk', flat=True)
+        self.last_pk = last.first() or 0
+        ids = []
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                ids.extend(self.flush(model, batch))
+                batch = []
+        ids.extend(self.flush(model, batch))
+        return ids
+
+    def flush(self, model, batch):
+        if not batch:
+            return []
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+            ids = list(model.objects.filter(
+                pk__gt=self.last_pk,
+            ).order_by('pk').values_list('pk', flat=True))
+        if len(ids) != len(batch):
+            raise CommandError(
+                f'{model._meta.verbose_name_plural}: ожидалось '
+                f'{len(batch)} новых строк, найдено {len(ids)}. '
+                'Похоже, в таблицу одновременно пишет кто-то еще.'
+            )
+        self.last_pk = ids[-1]
+        return ids
+
+    def create_users(self, prefix, count):
+        password = make_password('password')
+        start = User.objects.filter(
+            username__startswith=prefix,
+        ).count()
+        return self.insert(User, (
+            User(
+                username=f'{prefix}{start + index}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                password=password,
+                date_joined=self.now,
+            ) for index in range(count)
+        ))
+
+    def create_groups(self, prefix, count):
+        start = Group.objects.filter(slug__startswith=prefix).count()
+        return self.insert(Group, (
+            Group(
+                title=self.fake.catch_phrase(),
+                slug=f'{prefix}-{start + index}',
+                description=self.rng.choice(self.texts),
+            ) for index in range(count)
+        ))
+
+    def create_posts(self, user_ids, group_ids, authors, count):
+        def posts():
+            for _ in range(count):
+                pub_date = self.random_date()
+                group = self.rng.random() < 0.5 and group_ids
+                yield Post(
+                    author_id=user_ids[authors.choice()],
+                    group_id=self.rng.choice(group_ids) if group else None,
+                    text=self.rng.choice(self.texts),
+                    pub_date=pub_date,
+                    updated_at=pub_date,
+                )
+        fields = [Post._meta.get_field(name)
+                  for name in ('pub_date', 'updated_at')]
+        with explicit_dates(*fields):
+            return self.insert(Post, posts())
+
+    def create_follows(self, user_ids, authors, mean):
+        def follows():
+            for user_id in user_ids:
+                wanted = min(
+                    int(self.rng.expovariate(1 / mean)) if mean else 0,
+                    len(user_ids) - 1,
+                )
+                followed = set()
+                attempts = 0
+                while len(followed) < wanted and attempts < wanted * 5:
+                    attempts += 1
+                    author_id = user_ids[authors.choice()]
+                    if author_id != user_id:
+                        followed.add(author_id)
+                for author_id in followed:
+                    yield Follow(user_id=user_id, author_id=author_id)
+        return self.insert(Follow, follows())
+
+    def create_comments(self, user_ids, post_ids, alpha, count):
+        if not post_ids:
+            return []
+        popular = PowerLaw(len(post_ids), alpha, self.rng)
+
+        def comments():
+            for _ in range(count):
+                yield Comment(
+                    post_id=post_ids[popular.choice()],
+                    author_id=self.rng.choice(user_ids),
+                    text=self.rng.choice(self.texts),
+                    created=self.random_date(),
+                )
+        with explicit_dates(Comment._meta.get_field('created')):
+            return self.insert(Comment, comments())
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Готовит миниатюры картинок постов из очереди заданий.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число потоков обработки.',
+        )
+        parser.add_argument(
+            '--batch', type=int, default=None,
+            help='Сколько заданий забирать из очереди за раз.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=2.0,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь и завершиться.',
+        )
+        parser.add_argument(
+            '--enqueue-missing', action='store_true',
+            help='Поставить в очередь посты без миниатюр.',
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue_missing']:
+            queued = thumbnails.enqueue_missing()
+            self.stdout.write(f'Поставлено в очередь: {queued}')
+        while True:
+            done = thumbnails.run_pending(
+                workers=options['workers'],
+                batch=options['batch'],
+            )
+            if done:
+                self.stdout.write(f'Обработано заданий: {done}')
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['sleep'])
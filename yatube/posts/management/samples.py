@@ -0,0 +1,40 @@
+from django.urls import get_resolver, reverse
+
+from posts import urls
+from posts.models import Group, Post
+
+# Эти страницы меняют данные.
+WRITE_VIEWS = {'profile_follow', 'profile_unfollow', 'add_comment'}
+SAMPLE_QUERY = {'search': {'q': 'пост'}}
+
+
+def sample_urls(include_writes=False, urls_module=urls):
+    """Адреса всех страниц urls_module, заполненные данными из базы.
+
+    Возвращает пользователя для авторизованных запросов и список
+    кортежей (имя, адрес, параметры GET, шаблон URL).
+    """
+    post = Post.objects.select_related('author').order_by('-pk').first()
+    if post is None:
+        return None, []
+    group = Group.objects.first()
+    samples = {
+        'post_id': post.pk,
+        'username': post.author.username,
+        'slug': group.slug if group else 'none',
+    }
+    result = []
+    for pattern in get_resolver(urls_module).url_patterns:
+        if pattern.name in WRITE_VIEWS and not include_writes:
+            continue
+        kwargs = {
+            name: samples[name] for name in pattern.pattern.converters
+        }
+        name = f'{urls_module.app_name}:{pattern.name}'
+        result.append((
+            name,
+            reverse(name, kwargs=kwargs),
+            SAMPLE_QUERY.get(pattern.name),
+            pattern,
+        ))
+    return post.author, result
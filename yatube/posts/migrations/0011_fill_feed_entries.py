@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def fill_feed_entries(apps, schema_editor):
+    """Заполняет ленты по подпискам, созданным до появления лент.
+
+    Посты популярных авторов не рассылаются, их читает get_timeline.
+    """
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    FeedEntry = apps.get_model('posts', 'FeedEntry')
+    UserStats = apps.get_model('posts', 'UserStats')
+    prolific = UserStats.objects.filter(
+        followers_count__gt=settings.FEED_FANOUT_MAX_FOLLOWERS,
+    ).values('user_id')
+    follows = Follow.objects.exclude(author__in=prolific).values_list(
+        'user_id', 'author_id',
+    ).order_by('author_id')
+    posts = {}
+    batch = []
+    for user_id, author_id in follows.iterator():
+        if author_id not in posts:
+            posts.clear()
+            posts[author_id] = list(
+                Post.objects.filter(author_id=author_id).values_list(
+                    'pk', 'pub_date',
+                )
+            )
+        batch.extend(
+            FeedEntry(
+                user_id=user_id,
+                post_id=post_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            ) for post_id, pub_date in posts[author_id]
+        )
+        if len(batch) >= BATCH_SIZE:
+            FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_fill_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_feed_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def pause_popular_authors(apps, schema_editor):
+    """Рассылка стоит у авторов, которых раньше считали популярными."""
+    UserStats = apps.get_model('posts', 'UserStats')
+    UserStats.objects.filter(
+        followers_count__gt=settings.FEED_FANOUT_MAX_FOLLOWERS,
+    ).update(fanout_paused=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_fill_feed_entries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstats',
+            name='fanout_paused',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(
+            pause_popular_authors, migrations.RunPython.noop,
+        ),
+    ]
@@ -4,6 +4,36 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    """Готовые выборки постов для страниц."""
+
+    def for_listing(self):
+        """Посты для лент: автор и группа в том же запросе."""
+        return self.select_related('author', 'group')
+
+    def for_detail(self):
+        """Пост для отдельной страницы вместе со счетчиками автора."""
+        return self.select_related('author', 'author__stats', 'group')
+
+
+class CommentQuerySet(models.QuerySet):
+    """Готовые выборки комментариев для страниц."""
+
+    def for_listing(self):
+        """Комментарии вместе с авторами."""
+        return self.select_related('author')
+
+    def for_detail(self):
+        """Комментарии для страницы поста: только нужные шаблону колонки."""
+        return self.for_listing().only(
+            'id',
+            'text',
+            'created',
+            'author',
+            'author__username',
+        )
+
+
 class Group(models.Model):
     """Модель групп."""
     title = models.CharField(max_length=200)
@@ -18,6 +48,7 @@ class Post(models.Model):
     """Модель постов."""
     text = models.TextField()
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -35,6 +66,29 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    image_width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    image_height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    image_bytes = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    thumbnail_url = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self) -> str:
         return self.text[:15]
@@ -43,6 +97,20 @@ class Post(models.Model):
         ordering = ('-pub_date',)
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(
+                name='post_pub_date_id_idx',
+                fields=['-pub_date', '-id'],
+            ),
+            models.Index(
+                name='post_author_pub_date_idx',
+                fields=['author', '-pub_date', '-id'],
+            ),
+            models.Index(
+                name='post_group_pub_date_idx',
+                fields=['group', '-pub_date', '-id'],
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -63,6 +131,16 @@ class Comment(models.Model):
     )
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                name='comment_post_created_idx',
+                fields=['post', 'created', 'id'],
+            ),
+        ]
+
 
 class Follow(models.Model):
     """Модель подписок."""
@@ -84,3 +162,131 @@ class Follow(models.Model):
                 fields=['user', 'author'],
             ),
         ]
+        indexes = [
+            models.Index(
+                name='follow_author_user_idx',
+                fields=['author', 'user'],
+            ),
+        ]
+
+
+class UserStats(models.Model):
+    """Счетчики пользователя, обновляются сигналами."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    # Посты популярного автора не рассылаются по лентам подписчиков.
+    fanout_paused = models.BooleanField(default=False)
+
+    def __str__(self) -> str:
+        return str(self.user)
+
+
+class FeedEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date',)
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_feed_entries',
+                fields=['user', 'post'],
+            ),
+        ]
+        indexes = [
+            models.Index(
+                name='feed_user_pub_date_idx',
+                fields=['user', '-pub_date'],
+            ),
+        ]
+
+
+class ThumbnailJob(models.Model):
+    """Задание очереди на подготовку миниатюры картинки поста."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='thumbnail_jobs',
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ('created',)
+        indexes = [
+            models.Index(
+                name='thumbjob_status_created_idx',
+                fields=['status', 'created'],
+            ),
+        ]
+
+
+class ActivityCounter(models.Model):
+    """Активность поста или группы за один интервал времени.
+
+    Для постов считаются комментарии, для групп — новые посты
+    и комментарии к ним. Старые интервалы удаляет compact_trending.
+    """
+    POST = 'post'
+    GROUP = 'group'
+    KINDS = (
+        (POST, 'Пост'),
+        (GROUP, 'Группа'),
+    )
+    kind = models.CharField(max_length=5, choices=KINDS)
+    object_id = models.PositiveIntegerField()
+    bucket = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_activity_counters',
+                fields=['kind', 'object_id', 'bucket'],
+            ),
+        ]
+        indexes = [
+            models.Index(
+                name='activity_bucket_idx',
+                fields=['bucket'],
+            ),
+        ]
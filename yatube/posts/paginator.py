@@ -0,0 +1,134 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorPage:
+    """Страница курсорной пагинации."""
+    cursor_based = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинация по ключу вместо OFFSET: стоимость не зависит от глубины.
+
+    Ключ — пара полей с одинаковым направлением сортировки,
+    второе поле должно быть уникальным.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.descending = ordering[0].startswith('-')
+
+    def get_page(self, cursor=None):
+        """Возвращает страницу по непрозрачному токену курсора."""
+        direction, values = self.decode(cursor)
+        try:
+            if direction == PREVIOUS:
+                page = self._previous_page(values)
+                if page.object_list:
+                    return page
+                direction, values = None, None
+            return self._next_page(direction, values)
+        except (ValidationError, ValueError, TypeError):
+            return self._next_page(None, None)
+
+    def _next_page(self, direction, values):
+        queryset = self.queryset.order_by(*self.ordering)
+        if direction == NEXT:
+            queryset = queryset.filter(self._after(values, reverse=False))
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return self._page(rows, has_next, has_previous=direction == NEXT)
+
+    def _previous_page(self, values):
+        reverse_ordering = [
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        ]
+        queryset = self.queryset.order_by(*reverse_ordering).filter(
+            self._after(values, reverse=True)
+        )
+        rows = list(queryset[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return self._page(rows, has_next=True, has_previous=has_previous)
+
+    def _page(self, rows, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode(NEXT, self._key(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = self.encode(PREVIOUS, self._key(rows[0]))
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+    def _after(self, values, reverse):
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        first, second = self.fields
+        first_value, second_value = values
+        return (
+            Q(**{f'{first}__{lookup}': first_value})
+            | Q(**{first: first_value, f'{second}__{lookup}': second_value})
+        )
+
+    def _key(self, row):
+        if isinstance(row, dict):
+            return [row[field] for field in self.fields]
+        return [getattr(row, field) for field in self.fields]
+
+    @staticmethod
+    def encode(direction, values):
+        values = [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ]
+        data = json.dumps([direction, *values]).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    @staticmethod
+    def decode(cursor):
+        """Разбирает токен, битый или пустой токен ведет на первую страницу."""
+        if not cursor:
+            return None, None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, *values = json.loads(base64.urlsafe_b64decode(padded))
+        except (binascii.Error, ValueError, TypeError):
+            return None, None
+        if direction not in (NEXT, PREVIOUS) or len(values) != 2:
+            return None, None
+        return direction, values
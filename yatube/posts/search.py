@@ -0,0 +1,83 @@
+import re
+from functools import reduce
+from operator import and_
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+WORD_RE = re.compile(r'(\w+)(\*?)')
+
+
+def is_available():
+    """Полнотекстовый индекс FTS5 есть только в SQLite."""
+    return connection.vendor == 'sqlite'
+
+
+def build_match(query):
+    """Строка запроса FTS5: слова в кавычках, «слово*» — поиск по префиксу."""
+    terms = [
+        f'"{word}"{star}' for word, star in WORD_RE.findall(query or '')
+    ]
+    return ' '.join(terms)
+
+
+def search_posts(query, queryset=None):
+    """Посты по запросу, самые релевантные — первыми."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    match = build_match(query)
+    if not match:
+        return queryset.none()
+    if not is_available():
+        words = [word for word, _ in WORD_RE.findall(query)]
+        return queryset.filter(
+            reduce(and_, (Q(text__icontains=word) for word in words))
+        )
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={'rank': f'bm25({FTS_TABLE})'},
+    ).order_by('rank', '-pub_date')
+
+
+def index_post(post):
+    """Добавляет или обновляет пост в индексе."""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk],
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)',
+            [post.pk, post.text],
+        )
+
+
+def remove_post(post_id):
+    """Убирает пост из индекса."""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id],
+        )
+
+
+def rebuild():
+    """Пересобирает индекс по всем постам."""
+    if not is_available():
+        return 0
+    table = Post._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, text) '
+            f'SELECT id, text FROM {table}'
+        )
+        return cursor.rowcount
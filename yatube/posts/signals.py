@@ -0,0 +1,125 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import cache, counters, feeds, follows, search, trending
+from .models import ActivityCounter, Comment, Follow, Group, Post
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, raw=False, **kwargs):
+    """Рассылает новый пост по лентам подписчиков."""
+    if created and not raw:
+        feeds.fan_out(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_post_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_user(instance.author_id, posts_count=1)
+
+
+@receiver(post_delete, sender=Post)
+def count_post_deleted(sender, instance, **kwargs):
+    counters.change_user(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_post(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_deleted(sender, instance, **kwargs):
+    counters.change_post(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_user(instance.author_id, followers_count=1)
+        counters.change_user(instance.user_id, following_count=1)
+        feeds.follower_added(instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def count_follow_deleted(sender, instance, **kwargs):
+    counters.change_user(instance.author_id, followers_count=-1)
+    counters.change_user(instance.user_id, following_count=-1)
+    feeds.follower_removed(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def record_post_activity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.group_id:
+        trending.record((ActivityCounter.GROUP, instance.group_id))
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_activity(sender, instance, created, raw=False,
+                            **kwargs):
+    if not created or raw:
+        return
+    objects = [(ActivityCounter.POST, instance.post_id)]
+    group_id = instance.post.group_id
+    if group_id:
+        objects.append((ActivityCounter.GROUP, group_id))
+    trending.record(*objects)
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    group_ids = {instance.group_id, instance._loaded_group_id} - {None}
+    slugs = Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True,
+    )
+    cache.bump(
+        'posts',
+        f'post:{instance.pk}',
+        f'author:{instance.author.username}',
+        *(f'group:{slug}' for slug in slugs),
+    )
+    instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    cache.bump(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_pages(sender, instance, **kwargs):
+    cache.bump('groups', f'group:{instance.slug}')
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_pages(sender, instance, **kwargs):
+    # Счетчики подписок в профиле есть у обоих участников,
+    # отметки подписки в лентах — только у подписчика.
+    follows.forget(instance.user_id)
+    cache.bump(
+        f'author:{instance.author.username}',
+        f'author:{instance.user.username}',
+        f'followees:{instance.user_id}',
+    )
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, created, update_fields=None,
+                    **kwargs):
+    if created or update_fields is None or 'text' in update_fields:
+        search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_text(sender, instance, **kwargs):
+    search.remove_post(instance.pk)
@@ -0,0 +1,49 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from posts.cache import count_hit
+
+register = template.Library()
+
+CARD_KEY = 'posts:card:{}:{}:{}'
+
+
+def _card_key(post, show_author_link, show_group_link, following):
+    # Имена автора и группы не меняют updated_at поста.
+    related = '|'.join((
+        post.author.username,
+        post.author.get_full_name(),
+        post.group.slug if post.group else '',
+        str(int(show_author_link)),
+        str(int(show_group_link)),
+        str(int(following)),
+    ))
+    digest = hashlib.md5(related.encode()).hexdigest()
+    return CARD_KEY.format(post.pk, post.updated_at.timestamp(), digest)
+
+
+@register.simple_tag
+def post_card(post, show_author_link=True, show_group_link=True,
+              followee_ids=()):
+    """Карточка поста для лент, хранится в кеше до изменения поста.
+
+    По followee_ids карточка отмечает авторов из подписок.
+    """
+    following = post.author_id in followee_ids
+    key = _card_key(post, show_author_link, show_group_link, following)
+    html = cache.get(key)
+    count_hit('post_card', html is not None)
+    if html is None:
+        html = render_to_string('posts/includes/post_card.html', {
+            'post': post,
+            'show_author_link': show_author_link,
+            'show_group_link': show_group_link,
+            'following': following,
+        })
+        cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
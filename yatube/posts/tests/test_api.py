@@ -0,0 +1,170 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import api, api_urls, feeds
+from ..models import Follow, Group, Post
+from .utils import QueryBudgetMixin
+
+User = get_user_model()
+
+
+class PostsApiTests(QueryBudgetMixin, TestCase):
+    urls_module = api_urls
+    query_budgets = {
+        'api:post_list': 1,
+        'api:post_detail': 2,
+        'api:group_posts': 2,
+        'api:profile': 2,
+        'api:follow_feed': 4,
+        'api:post_export': 3,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.author = User.objects.create_user(
+            username='author',
+            first_name='Лев',
+            last_name='Толстой',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author,
+                text=f'Тестовый пост {index}',
+                group=cls.group if index % 2 else None,
+            ) for index in range(api.NUM_OBJECTS_PER_PAGE + 5)
+        ]
+        Follow.objects.create(user=cls.user, author=cls.author)
+        feeds.backfill(cls.user, cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_all_views_have_budget(self):
+        """Для каждого адреса API объявлен бюджет запросов."""
+        self.assertAllViewsBudgeted()
+
+    def test_views_within_query_budget(self):
+        """Адреса API не делают запросов сверх бюджета."""
+        pages = (
+            ('api:post_list', reverse('api:post_list'), self.guest_client),
+            (
+                'api:post_detail',
+                reverse('api:post_detail', args=(self.posts[0].pk,)),
+                self.guest_client,
+            ),
+            (
+                'api:group_posts',
+                reverse('api:group_posts', args=(self.group.slug,)),
+                self.guest_client,
+            ),
+            (
+                'api:profile',
+                reverse('api:profile', args=(self.author.username,)),
+                self.guest_client,
+            ),
+            (
+                'api:follow_feed',
+                reverse('api:follow_feed'),
+                self.authorized_client,
+            ),
+            (
+                'api:post_export',
+                reverse('api:post_export'),
+                self.authorized_client,
+            ),
+        )
+        for name, url, client in pages:
+            with self.subTest(name=name):
+                self.assertQueryBudget(name, url, client)
+
+    def test_post_list_follows_cursor(self):
+        """Лента API отдается страницами по курсору."""
+        url = reverse('api:post_list')
+        first = self.guest_client.get(url).json()
+        self.assertEqual(len(first['results']), api.NUM_OBJECTS_PER_PAGE)
+        self.assertEqual(first['results'][0]['text'], 'Тестовый пост 24')
+        self.assertIsNone(first['previous_cursor'])
+        second = self.guest_client.get(
+            url, {'cursor': first['next_cursor']},
+        ).json()
+        self.assertEqual(len(second['results']), 5)
+        self.assertIsNone(second['next_cursor'])
+        limited = self.guest_client.get(url, {'limit': 3}).json()
+        self.assertEqual(len(limited['results']), 3)
+
+    def test_post_detail(self):
+        """Пост отдается с автором, группой и счетчиком комментариев."""
+        post = self.posts[1]
+        response = self.guest_client.get(
+            reverse('api:post_detail', args=(post.pk,))
+        )
+        data = response.json()
+        self.assertEqual(data['id'], post.pk)
+        self.assertEqual(data['author'], 'author')
+        self.assertEqual(data['group'], 'test-slug')
+        self.assertEqual(data['comments_count'], 0)
+        self.assertIsNone(data['image'])
+        self.assertTrue(response.has_header('ETag'))
+
+    def test_missing_objects(self):
+        """Несуществующие объекты — 404 в JSON."""
+        urls = (
+            reverse('api:post_detail', args=(0,)),
+            reverse('api:group_posts', args=('missing',)),
+            reverse('api:profile', args=('missing',)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertIn('detail', response.json())
+
+    def test_group_and_profile(self):
+        """Группа и профиль отдаются вместе с постами."""
+        group = self.guest_client.get(
+            reverse('api:group_posts', args=(self.group.slug,))
+        ).json()
+        self.assertEqual(group['group']['title'], 'Тестовая группа')
+        self.assertEqual(len(group['results']), 12)
+        profile = self.guest_client.get(
+            reverse('api:profile', args=('author',))
+        ).json()
+        self.assertEqual(profile['author']['full_name'], 'Лев Толстой')
+        self.assertEqual(profile['author']['followers_count'], 1)
+
+    def test_follow_feed_requires_login(self):
+        """Лента подписок доступна только вошедшим."""
+        url = reverse('api:follow_feed')
+        self.assertEqual(self.guest_client.get(url).status_code, 401)
+        data = self.authorized_client.get(url).json()
+        self.assertEqual(len(data['results']), api.NUM_OBJECTS_PER_PAGE)
+
+    def test_export_streams_ndjson(self):
+        """Выгрузка отдается потоком по строке JSON на пост."""
+        response = self.authorized_client.get(
+            reverse('api:post_export'), {'group': 'test-slug'},
+        )
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows[0]['text'], 'Тестовый пост 1')
+
+    def test_export_requires_login(self):
+        """Выгрузка недоступна анонимным посетителям."""
+        response = self.guest_client.get(reverse('api:post_export'))
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,206 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import Comment, Group, Post
+from ..search import search_posts
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+User = get_user_model()
+
+
+class ExplainViewsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(author=cls.user, text='Пост', group=cls.group)
+
+    def test_listing_queries_use_indexes(self):
+        """Запросы лент постов не просматривают таблицы целиком."""
+        out = StringIO()
+        call_command('explain_views', '--verbose-plans', stdout=out)
+        report = out.getvalue()
+        self.assertIn('posts:index', report)
+        listing_plans = report.split('posts:search')[0]
+        self.assertNotIn('!!', listing_plans)
+
+
+class SeedAndBenchmarkCommandTests(TestCase):
+    def test_seed_data_and_benchmark(self):
+        """seed_data заполняет базу, benchmark сохраняет отчет в JSON."""
+        call_command(
+            'seed_data',
+            '--users=20',
+            '--groups=3',
+            '--posts=200',
+            '--comments=100',
+            '--follows=3',
+            '--seed=1',
+            '--batch-size=50',
+            stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(
+            User.objects.get(pk=Post.objects.first().author_id)
+            .stats.posts_count,
+            Post.objects.filter(author_id=Post.objects.first().author_id)
+            .count(),
+        )
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command(
+                'benchmark',
+                '--iterations=3',
+                '--warmup=0',
+                f'--output={output.name}',
+                stdout=StringIO(),
+            )
+            report = json.load(output)
+        self.assertIn('posts:index', report['results'])
+        for result in report['results'].values():
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+            self.assertEqual(result['status'], 200)
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command(
+                'benchmark',
+                '--api',
+                '--iterations=3',
+                '--warmup=0',
+                f'--output={output.name}',
+                stdout=StringIO(),
+            )
+            report = json.load(output)
+        self.assertIn('api:post_export', report['results'])
+        self.assertEqual(Post.objects.count(), 200)
+
+    def test_seed_data_after_deleted_rows(self):
+        """Новые id перечитываются, даже если последний пост удален."""
+        user = User.objects.create_user(username='HasNoName')
+        Post.objects.create(author=user, text='Первый пост')
+        Post.objects.create(author=user, text='Удаленный пост').delete()
+        call_command(
+            'seed_data',
+            '--users=5',
+            '--groups=1',
+            '--posts=20',
+            '--comments=30',
+            '--follows=2',
+            '--seed=1',
+            '--batch-size=7',
+            '--skip-post-process',
+            stdout=StringIO(),
+        )
+        self.assertEqual(Comment.objects.count(), 30)
+        self.assertFalse(Comment.objects.filter(post__author=user).exists())
+        self.assertEqual(Post.objects.exclude(author=user).count(), 20)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ExportImportCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user,
+                text=f'Пост номер {index}',
+                group=cls.group if index % 2 else None,
+            ) for index in range(5)
+        ]
+        cls.posts[0].image = SimpleUploadedFile(
+            name='small.gif',
+            content=SMALL_GIF,
+            content_type='image/gif',
+        )
+        cls.posts[0].save()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def round_trip(self, name):
+        path = os.path.join(self.directory, name)
+        images = os.path.join(self.directory, 'images')
+        call_command(
+            'export_posts', path, f'--images={images}', stdout=StringIO(),
+        )
+        pub_dates = list(
+            Post.objects.order_by('id').values_list('pub_date', flat=True)
+        )
+        Post.objects.all().delete()
+        User.objects.filter(username='HasNoName').delete()
+        out = StringIO()
+        call_command(
+            'import_posts', path, f'--images={images}', '--create-missing',
+            '--batch-size=2', stdout=out,
+        )
+        self.assertIn('строк/с', out.getvalue())
+        self.assertEqual(
+            list(Post.objects.order_by('id').values_list(
+                'pub_date', flat=True,
+            )),
+            pub_dates,
+        )
+        author = User.objects.get(username='HasNoName')
+        self.assertEqual(author.stats.posts_count, 5)
+        self.assertEqual(
+            Post.objects.filter(group__slug='test-slug').count(), 2,
+        )
+        self.assertEqual(search_posts('номер').count(), 5)
+        post = Post.objects.exclude(image='').get()
+        self.assertTrue(os.path.exists(post.image.path))
+        self.assertEqual((post.image_width, post.image_height), (2, 1))
+        self.assertEqual(post.image_bytes, post.image.size)
+
+    def test_ndjson_round_trip(self):
+        """Посты переносятся через NDJSON вместе с картинками."""
+        self.round_trip('posts.ndjson')
+
+    def test_csv_round_trip(self):
+        """Посты переносятся через CSV вместе с картинками."""
+        self.round_trip('posts.csv')
+
+    def test_unknown_author_skipped(self):
+        """Без --create-missing посты неизвестных авторов пропускаются."""
+        path = os.path.join(self.directory, 'posts.ndjson')
+        call_command('export_posts', path, stdout=StringIO())
+        User.objects.filter(username='HasNoName').delete()
+        out = StringIO()
+        call_command('import_posts', path, stdout=out)
+        self.assertIn('пропущено: 5', out.getvalue())
+        self.assertFalse(Post.objects.exists())
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import follows
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        Post.objects.create(author=cls.author, text='Пост автора')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_follow_and_unfollow_are_idempotent(self):
+        """Повторные подписка и отписка ничего не меняют."""
+        self.assertTrue(follows.follow(self.user, self.author))
+        self.assertFalse(follows.follow(self.user, self.author))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.author.stats.followers_count, 1)
+        self.assertTrue(follows.unfollow(self.user, self.author))
+        self.assertFalse(follows.unfollow(self.user, self.author))
+        self.assertFalse(Follow.objects.exists())
+        self.author.stats.refresh_from_db()
+        self.assertEqual(self.author.stats.followers_count, 0)
+
+    def test_follow_signal_gets_row_pk(self):
+        """Сигнал подписки получает id вставленной записи."""
+        seen = []
+
+        def receiver(instance, **kwargs):
+            seen.append(instance.pk)
+
+        post_save.connect(receiver, sender=Follow)
+        self.addCleanup(post_save.disconnect, receiver, sender=Follow)
+        Follow.objects.create(user=self.author, author=self.user)
+        follows.follow(self.user, self.author)
+        follows.follow(self.user, self.author)
+        self.assertEqual(
+            seen[-1], Follow.objects.get(user=self.user).pk,
+        )
+        self.assertEqual(len(seen), 2)
+
+    def test_followee_ids_cached_until_follow_changes(self):
+        """Множество подписок читается из кеша до изменения подписок."""
+        self.assertEqual(follows.get_followee_ids(self.user), frozenset())
+        with self.assertNumQueries(0):
+            follows.get_followee_ids(self.user)
+        follows.follow(self.user, self.author)
+        self.assertEqual(
+            follows.get_followee_ids(self.user),
+            {self.author.pk},
+        )
+        follows.unfollow(self.user, self.author)
+        self.assertEqual(follows.get_followee_ids(self.user), frozenset())
+
+    def test_listing_marks_followed_authors(self):
+        """Лента отмечает авторов из подписок, отметка снимается."""
+        url = reverse('posts:index')
+        self.assertNotContains(
+            self.authorized_client.get(url),
+            'вы подписаны',
+        )
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=('author',)),
+        )
+        self.assertContains(self.authorized_client.get(url), 'вы подписаны')
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', args=('author',)),
+        )
+        self.assertNotContains(
+            self.authorized_client.get(url),
+            'вы подписаны',
+        )
@@ -1,11 +1,13 @@
 import shutil
 import tempfile
+from io import BytesIO
 
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.conf import settings
 from django.urls import reverse
+from PIL import Image
 
 from ..models import Group, Post
 from ..forms import PostForm
@@ -77,6 +79,11 @@ class PostCreateFormTests(TestCase):
         self.assertEqual(new_post.author, self.user)
         self.assertEqual(new_post.group.pk, self.group.pk)
         self.assertEqual(new_post.image, 'posts/small.gif')
+        self.assertEqual(
+            (new_post.image_width, new_post.image_height),
+            (2, 1),
+        )
+        self.assertEqual(new_post.image_bytes, new_post.image.size)
 
     def test_edit_post(self):
         """Валидная форма редактирует запись в Post."""
@@ -126,3 +133,88 @@ class PostCreateFormTests(TestCase):
             response_post.context['comments'][0].author,
             self.user,
         )
+
+
+def make_jpeg(size, exif=None):
+    output = BytesIO()
+    Image.new('RGB', size, 'red').save(
+        output, 'JPEG', **({'exif': exif} if exif else {}),
+    )
+    return output.getvalue()
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    POST_IMAGE_MAX_SIDE=100,
+    POST_IMAGE_MAX_PIXELS=1_000_000,
+    POST_IMAGE_MAX_UPLOAD_SIZE=100_000,
+)
+class PostImageFormTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def form(self, content, name='photo.jpg'):
+        return PostForm(
+            {'text': 'Пост с картинкой'},
+            {'image': SimpleUploadedFile(name, content, 'image/jpeg')},
+        )
+
+    def test_large_image_downscaled_without_metadata(self):
+        """Картинка уменьшается, пересохраняется без EXIF, размеры в посте."""
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        form = self.form(make_jpeg((400, 200), exif.tobytes()))
+        self.assertTrue(form.is_valid(), form.errors)
+        post = form.save(commit=False)
+        post.author = self.user
+        post.save()
+        self.assertEqual((post.image_width, post.image_height), (100, 50))
+        self.assertEqual(post.image_bytes, post.image.size)
+        with Image.open(post.image.path) as saved:
+            self.assertEqual(saved.size, (100, 50))
+            self.assertEqual(len(saved.getexif()), 0)
+
+    def test_oversized_file_rejected(self):
+        """Файл больше лимита отклоняется до чтения картинки."""
+        form = self.form(b'\0' * 100_001)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()['image'][0].code,
+                         'file_too_large')
+
+    def test_too_many_pixels_rejected(self):
+        """Картинка с большим числом пикселей отклоняется по заголовку."""
+        form = self.form(make_jpeg((2000, 1000)))
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()['image'][0].code,
+                         'too_many_pixels')
+
+    def test_not_an_image_rejected(self):
+        """Файл не картинка отклоняется."""
+        form = self.form(b'not an image')
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    def test_truncated_image_rejected(self):
+        """Оборванный файл с верным заголовком отклоняется формой."""
+        output = BytesIO()
+        Image.effect_noise((50, 50), 64).save(output, 'PNG')
+        form = self.form(output.getvalue()[:60], name='photo.png')
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()['image'][0].code,
+                         'invalid_image')
+
+    def test_create_view_checks_csrf(self):
+        """Страница создания поста по-прежнему проверяет CSRF."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(
+            reverse('posts:post_create'), {'text': 'Без токена'},
+        )
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+
+from .. import cache as posts_cache
+from ..cache import get_stats
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        posts_cache._hits.discard()
+
+    def render(self, post, flags=''):
+        return Template(
+            '{% load post_cards %}{% post_card post' + flags + ' %}'
+        ).render(Context({'post': post}))
+
+    def test_card_rendered_from_cache(self):
+        """Повторная отрисовка карточки берется из кеша."""
+        first = self.render(self.post)
+        second = self.render(self.post)
+        self.assertEqual(first, second)
+        self.assertIn('все записи группы', first)
+        self.assertEqual(
+            get_stats()['post_card'],
+            {'hits': 1, 'misses': 1},
+        )
+
+    def test_card_refreshed_after_edit(self):
+        """Правка поста меняет ключ карточки."""
+        self.render(self.post)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        self.assertIn('Исправленный текст', self.render(post))
+        self.assertEqual(get_stats()['post_card']['misses'], 2)
+
+    def test_card_variants_cached_separately(self):
+        """Карточки с разными флагами кешируются отдельно."""
+        self.render(self.post)
+        html = self.render(self.post, ' show_group_link=False')
+        self.assertNotIn('все записи группы', html)
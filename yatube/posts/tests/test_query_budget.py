@@ -0,0 +1,139 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import urls
+from ..models import Comment, Follow, Group, Post
+from .utils import QueryBudgetMixin
+
+User = get_user_model()
+
+
+class PostsQueryBudgetTests(QueryBudgetMixin, TestCase):
+    urls_module = urls
+    query_budgets = {
+        'posts:index': 4,
+        'posts:group_list': 4,
+        'posts:profile': 4,
+        'posts:post_detail': 5,
+        'posts:post_comments': 5,
+        'posts:search': 5,
+        'posts:post_create': 3,
+        'posts:post_edit': 4,
+        'posts:add_comment': 7,
+        'posts:follow_index': 4,
+        'posts:profile_follow': 11,
+        'posts:profile_unfollow': 8,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'author{index}')
+            for index in range(10)
+        ]
+        cls.posts = [
+            Post.objects.create(
+                author=author,
+                text=f'Тестовый пост {index}',
+                group=cls.group,
+            ) for index, author in enumerate(cls.authors)
+        ]
+        cls.post = cls.posts[0]
+        for author in cls.authors:
+            Comment.objects.create(
+                post=cls.post,
+                author=author,
+                text='Комментарий',
+            )
+            Follow.objects.create(user=cls.user, author=author)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.author_client = Client()
+        self.author_client.force_login(self.post.author)
+        cache.clear()
+
+    def test_all_views_have_budget(self):
+        """Для каждой страницы posts объявлен бюджет запросов."""
+        self.assertAllViewsBudgeted()
+
+    def test_pages_within_query_budget(self):
+        """Страницы не делают запросов сверх бюджета."""
+        author = self.post.author.username
+        pages = (
+            ('posts:index', reverse('posts:index'), self.authorized_client),
+            (
+                'posts:group_list',
+                reverse('posts:group_list', args=(self.group.slug,)),
+                self.authorized_client,
+            ),
+            (
+                'posts:profile',
+                reverse('posts:profile', args=(author,)),
+                self.authorized_client,
+            ),
+            (
+                'posts:post_detail',
+                reverse('posts:post_detail', args=(self.post.pk,)),
+                self.authorized_client,
+            ),
+            (
+                'posts:post_comments',
+                reverse('posts:post_comments', args=(self.post.pk,)),
+                self.authorized_client,
+            ),
+            (
+                'posts:search',
+                reverse('posts:search') + '?q=пост',
+                self.authorized_client,
+            ),
+            (
+                'posts:post_create',
+                reverse('posts:post_create'),
+                self.authorized_client,
+            ),
+            (
+                'posts:post_edit',
+                reverse('posts:post_edit', args=(self.post.pk,)),
+                self.author_client,
+            ),
+            (
+                'posts:follow_index',
+                reverse('posts:follow_index'),
+                self.authorized_client,
+            ),
+            (
+                'posts:profile_unfollow',
+                reverse('posts:profile_unfollow', args=(author,)),
+                self.authorized_client,
+            ),
+            (
+                'posts:profile_follow',
+                reverse('posts:profile_follow', args=(author,)),
+                self.authorized_client,
+            ),
+        )
+        for name, url, client in pages:
+            with self.subTest(name=name):
+                self.assertQueryBudget(name, url, client)
+
+    def test_add_comment_within_query_budget(self):
+        """Добавление комментария укладывается в бюджет."""
+        self.assertQueryBudget(
+            'posts:add_comment',
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            self.authorized_client,
+            method='post',
+            data={'text': 'Новый комментарий'},
+        )
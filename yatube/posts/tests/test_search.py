@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..search import build_match
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.user_other = User.objects.create_user(username='another')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.python_post = Post.objects.create(
+            author=cls.user,
+            text='Питон питон и еще раз питон',
+            group=cls.group,
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.user_other,
+            text='Питоновые змеи и программирование',
+        )
+        cls.rare_post = Post.objects.create(
+            author=cls.user,
+            text='Один раз упомянут питон среди длинного рассказа о чае',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, **params):
+        response = self.guest_client.get(reverse('posts:search'), params)
+        return list(response.context['page_obj'])
+
+    def test_build_match_quotes_terms(self):
+        """Слова запроса экранируются, звездочка оставляется."""
+        self.assertEqual(build_match('пит* "OR" x'), '"пит"* "OR" "x"')
+
+    def test_ranked_results(self):
+        """Более релевантный пост идет первым."""
+        self.assertEqual(
+            self.search(q='питон'),
+            [self.python_post, self.rare_post],
+        )
+
+    def test_prefix_query(self):
+        """Запрос со звездочкой ищет по началу слова."""
+        self.assertIn(self.other_post, self.search(q='питон*'))
+
+    def test_filters(self):
+        """Поиск фильтруется по группе и автору."""
+        self.assertEqual(
+            self.search(q='питон*', group=self.group.slug),
+            [self.python_post],
+        )
+        self.assertEqual(
+            self.search(q='питон*', author=self.user_other.username),
+            [self.other_post],
+        )
+
+    def test_index_follows_edits(self):
+        """Индекс обновляется при правке и удалении поста."""
+        rare_post = Post.objects.get(pk=self.rare_post.pk)
+        rare_post.text = 'Теперь только про чай'
+        rare_post.save()
+        self.assertEqual(self.search(q='питон'), [self.python_post])
+        Post.objects.get(pk=self.python_post.pk).delete()
+        self.assertEqual(self.search(q='питон'), [])
+
+    def test_admin_uses_index(self):
+        """Поиск в админке идет через тот же индекс."""
+        admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='password',
+        )
+        self.guest_client.force_login(admin)
+        response = self.guest_client.get(
+            '/admin/posts/post/',
+            {'q': 'питон'},
+        )
+        self.assertEqual(
+            set(response.context['cl'].result_list),
+            {self.python_post, self.rare_post},
+        )
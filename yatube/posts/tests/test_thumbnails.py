@@ -0,0 +1,116 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import thumbnails
+from ..models import Post, ThumbnailJob
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailPipelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def create_post(self):
+        self.authorized_client.post(reverse('posts:post_create'), data={
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(
+                name='small.gif',
+                content=SMALL_GIF,
+                content_type='image/gif',
+            ),
+        })
+        return Post.objects.get(text='Пост с картинкой')
+
+    def test_upload_enqueues_job(self):
+        """Загрузка картинки ставит задание, а не режет ее в запросе."""
+        post = self.create_post()
+        self.assertEqual(post.thumbnail_url, '')
+        self.assertTrue(ThumbnailJob.objects.filter(
+            post=post,
+            status=ThumbnailJob.PENDING,
+        ).exists())
+
+    def test_worker_stores_thumbnail_url(self):
+        """Обработчик сохраняет адрес миниатюры в посте."""
+        post = self.create_post()
+        self.assertEqual(thumbnails.run_pending(), 1)
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_url.startswith(settings.MEDIA_URL))
+        self.assertEqual(
+            ThumbnailJob.objects.get(post=post).status,
+            ThumbnailJob.DONE,
+        )
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(response, post.thumbnail_url)
+
+    def test_enqueue_missing(self):
+        """Команда ставит в очередь посты без миниатюр."""
+        post = self.create_post()
+        ThumbnailJob.objects.all().delete()
+        call_command(
+            'thumbnail_worker',
+            '--once',
+            '--enqueue-missing',
+            '--workers=1',
+            stdout=StringIO(),
+        )
+        post.refresh_from_db()
+        self.assertNotEqual(post.thumbnail_url, '')
+
+    def test_deleted_job_skipped(self):
+        """Задание удаленного после захвата поста пропускается."""
+        post = self.create_post()
+        job_ids = thumbnails.claim(10)
+        post.delete()
+        for job_id in job_ids:
+            self.assertIsNone(thumbnails.process(job_id))
+
+    def test_stuck_job_fails_after_max_attempts(self):
+        """Зависшее задание без попыток в запасе не берется снова."""
+        post = self.create_post()
+        ThumbnailJob.objects.filter(post=post).update(
+            status=ThumbnailJob.RUNNING,
+            attempts=settings.THUMBNAIL_JOB_MAX_ATTEMPTS,
+            started=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(thumbnails.claim(10), [])
+        self.assertEqual(
+            ThumbnailJob.objects.get(post=post).status,
+            ThumbnailJob.FAILED,
+        )
@@ -0,0 +1,94 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import trending
+from ..models import ActivityCounter, Comment, Group, Post
+
+User = get_user_model()
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Активная группа',
+            slug='active',
+            description='Описание',
+        )
+        cls.quiet_post = Post.objects.create(
+            author=cls.user,
+            text='Тихий пост',
+        )
+        cls.hot_post = Post.objects.create(
+            author=cls.user,
+            text='Горячий пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def comment(self, post, count=1):
+        for _ in range(count):
+            Comment.objects.create(post=post, author=self.user, text='К')
+
+    def test_activity_counted_per_bucket(self):
+        """Новые посты и комментарии увеличивают счетчики интервала."""
+        self.comment(self.hot_post, 2)
+        counters = dict(ActivityCounter.objects.values_list(
+            'kind', 'count',
+        ))
+        self.assertEqual(counters, {'post': 2, 'group': 3})
+        self.assertEqual(ActivityCounter.objects.count(), 2)
+
+    def test_compact_ranks_with_decay_and_prunes(self):
+        """Старая активность затухает, устаревшие интервалы удаляются."""
+        self.comment(self.hot_post, 2)
+        now = trending.current_bucket()
+        ActivityCounter.objects.bulk_create([
+            # Десять комментариев два периода полураспада назад — 2.5.
+            ActivityCounter(
+                kind=ActivityCounter.POST,
+                object_id=self.quiet_post.pk,
+                bucket=now - 24,
+                count=10,
+            ),
+            ActivityCounter(
+                kind=ActivityCounter.POST,
+                object_id=self.quiet_post.pk,
+                bucket=now - 100,
+                count=1000,
+            ),
+        ])
+        out = StringIO()
+        call_command('compact_trending', stdout=out)
+        self.assertIn('удалено интервалов: 1', out.getvalue())
+        result = trending.get_trending()
+        self.assertEqual(
+            [post['id'] for post in result['posts']],
+            [self.quiet_post.pk, self.hot_post.pk],
+        )
+        self.assertEqual(result['posts'][0]['score'], 2.5)
+        self.assertEqual(result['groups'][0]['slug'], 'active')
+
+    def test_sidebar_reads_precomputed_list(self):
+        """Боковая панель показывает результат compact_trending."""
+        self.comment(self.hot_post)
+        client = Client()
+        url = reverse('posts:index')
+        self.assertNotContains(client.get(url), 'Популярное')
+        trending.compact()
+        response = client.get(url)
+        self.assertContains(response, 'Популярное')
+        self.assertContains(response, 'Горячий пост')
+        self.assertContains(
+            client.get(reverse('posts:group_list', args=('active',))),
+            'Активные группы',
+        )
@@ -1,16 +1,26 @@
 import datetime
+from hashlib import md5
+from http import HTTPStatus
 import shutil
 import tempfile
+from io import StringIO
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase, override_settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
+from django.core.management import call_command
 from django.conf import settings
 from django.urls import reverse
 from django import forms
 
-from ..models import Group, Post, Follow
+from core import db
+
+from .. import views
+from ..cache import cached_page
+from ..models import Comment, Group, Post, Follow
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -62,6 +72,7 @@ class PostsPagesTests(TestCase):
             minute = datetime.timedelta(minutes=index)
             value.pub_date += minute
         Post.objects.bulk_update(cls.posts, ['pub_date'])
+        call_command('recount', stdout=StringIO())
         cls.post13 = Post.objects.create(
             author=cls.user_other,
             text='Тестовый пост13',
@@ -86,6 +97,13 @@ class PostsPagesTests(TestCase):
         self.assertEqual(first_object, self.posts[11])
         self.assertEqual(first_object.image, self.posts[11].image)
 
+    def second_page(self, url):
+        """Вторая страница списка по курсору первой."""
+        cache.clear()
+        response = self.authorized_client.get(url)
+        cursor = response.context['page_obj'].next_cursor
+        return self.authorized_client.get(url, {'cursor': cursor})
+
     def test_pages_uses_correct_template(self):
         """URL-адрес использует соответствующий шаблон."""
         templates_pages_names = {
@@ -125,6 +143,35 @@ class PostsPagesTests(TestCase):
 
     def test_index_second_page_contains_three_records(self):
         """Проверка: на второй странице / должно быть три поста."""
+        response = self.second_page(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 3)
+
+    def test_index_previous_cursor_returns_first_page(self):
+        """Курсор предыдущей страницы возвращает первую страницу."""
+        first_page = self.authorized_client.get(reverse('posts:index'))
+        second_page = self.second_page(reverse('posts:index'))
+        cache.clear()
+        response = self.authorized_client.get(
+            reverse('posts:index'),
+            {'cursor': second_page.context['page_obj'].previous_cursor},
+        )
+        self.assertEqual(
+            list(response.context['page_obj']),
+            list(first_page.context['page_obj']),
+        )
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_index_broken_cursor_returns_first_page(self):
+        """Битый курсор не ломает страницу."""
+        response = self.authorized_client.get(
+            reverse('posts:index'),
+            {'cursor': 'broken'},
+        )
+        self.first_object_test(response)
+
+    @override_settings(POSTS_PAGINATION='offset')
+    def test_index_offset_pagination(self):
+        """Старые ссылки с номером страницы работают в режиме offset."""
         response = self.authorized_client.get(
             reverse('posts:index'),
             {'page': 2},
@@ -155,10 +202,10 @@ class PostsPagesTests(TestCase):
 
     def test_group_list_second_page_contains_two_records(self):
         """Проверка: на второй странице группы должно быть два поста."""
-        response = self.authorized_client.get(reverse(
+        response = self.second_page(reverse(
             'posts:group_list',
             kwargs={'slug': self.group.slug},
-        ), {'page': 2})
+        ))
         self.assertEqual(len(response.context['page_obj']), 2)
 
     def test_profile_show_correct_context(self):
@@ -181,10 +228,10 @@ class PostsPagesTests(TestCase):
 
     def test_profile_second_page_contains_two_records(self):
         """Проверка: на второй странице profile должно быть три поста."""
-        response = self.authorized_client.get(reverse(
+        response = self.second_page(reverse(
             'posts:profile',
             kwargs={'username': 'HasNoName'},
-        ), {'page': 2})
+        ))
         self.assertEqual(len(response.context['page_obj']), 2)
 
     def test_post_detail_show_correct_context(self):
@@ -228,22 +275,55 @@ class PostsPagesTests(TestCase):
                 self.assertIsInstance(form_field_create, expected)
 
     def test_cache_index_page(self):
-        """Тестирование кеширования."""
+        """Главная отдается из кеша, пока посты не менялись."""
         response = self.authorized_client.get(reverse('posts:index'))
         cache_check = response.content
-        Post.objects.first().delete()
+        Post.objects.filter(pk=self.posts[11].pk).update(text='Без сигнала')
         response = self.authorized_client.get(reverse('posts:index'))
         self.assertEqual(response.content, cache_check)
 
+    def test_delete_invalidates_index_page(self):
+        """Удаление поста сразу сбрасывает кеш главной."""
+        response = self.authorized_client.get(reverse('posts:index'))
+        cache_check = response.content
+        Post.objects.first().delete()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertNotEqual(response.content, cache_check)
+
     def test_without_cache_index_page(self):
         """Тестирование без кеша."""
         response = self.authorized_client.get(reverse('posts:index'))
         cache_check = response.content
-        Post.objects.first().delete()
+        Post.objects.filter(pk=self.posts[11].pk).update(text='Без сигнала')
         cache.clear()
         response = self.authorized_client.get(reverse('posts:index'))
         self.assertNotEqual(response.content, cache_check)
 
+    def test_cache_serves_stale_page_while_locked(self):
+        """Пока страницу пересобирает другой обработчик, отдается копия."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        response = self.guest_client.get(url)
+        cache_check = response.content
+        Post.objects.get(pk=self.posts[11].pk).delete()
+        lock_key = f'posts:page:group_posts:0:{md5(url.encode()).hexdigest()}'
+        cache.set(f'{lock_key}:lock', 1)
+        response = self.guest_client.get(url)
+        self.assertEqual(response.content, cache_check)
+        cache.delete(f'{lock_key}:lock')
+        response = self.guest_client.get(url)
+        self.assertNotEqual(response.content, cache_check)
+
+    def test_comment_invalidates_post_detail(self):
+        """Новый комментарий сбрасывает кеш страницы поста."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post13.pk})
+        self.guest_client.get(url)
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post13.pk}),
+            {'text': 'Свежий комментарий'},
+        )
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Свежий комментарий')
+
     def test_profile_follow(self):
         """Авторизованный пользователь может подписаться на автора."""
         self.authorized_client.get(reverse(
@@ -283,3 +363,153 @@ class PostsPagesTests(TestCase):
             user=self.user,
             author=self.user_other,
         ).exists())
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_not_modified_by_etag(self):
+        """Повторный запрос с ETag получает 304, пока данные не менялись."""
+        url = reverse('posts:index')
+        etag = self.authorized_client.get(url)['ETag']
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_user(self):
+        """ETag страницы разный для разных пользователей."""
+        url = reverse('posts:profile', kwargs={'username': 'HasNoName'})
+        self.assertNotEqual(
+            self.guest_client.get(url)['ETag'],
+            self.authorized_client.get(url)['ETag'],
+        )
+
+    def test_not_modified_since_for_guest(self):
+        """Аноним получает 304 по Last-Modified, пока нет комментариев."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        last_modified = self.guest_client.get(url)['Last-Modified']
+        response = self.guest_client.get(
+            url,
+            HTTP_IF_MODIFIED_SINCE=last_modified,
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertFalse(
+            self.authorized_client.get(url).has_header('Last-Modified')
+        )
+
+
+class CachedPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_replay_keeps_view_headers(self):
+        """Страница из кеша отдается с заголовками, выставленными view."""
+        calls = []
+
+        @cached_page(lambda request: ['posts'])
+        def view(request):
+            calls.append(request)
+            response = HttpResponse('Страница')
+            response['Cache-Control'] = 'private, max-age=60'
+            response['X-Custom'] = '1'
+            response.set_cookie('seen', '1')
+            return response
+
+        request = RequestFactory().get('/cached/')
+        request.user = AnonymousUser()
+        view(request)
+        replayed = view(request)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(replayed['Cache-Control'], 'private, max-age=60')
+        self.assertEqual(replayed['X-Custom'], '1')
+        self.assertNotIn('seen', replayed.cookies)
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_page_rebuilt_from_primary(self):
+        """Страница для кеша собирается по основной базе, не по реплике."""
+        router = db.ReplicaRouter()
+        seen = []
+
+        @cached_page(lambda request: ['posts'])
+        def view(request):
+            seen.append(router.db_for_read(Post))
+            return HttpResponse('Страница')
+
+        request = RequestFactory().get('/cached/')
+        request.user = AnonymousUser()
+        with db.replica_reads():
+            view(request)
+        self.assertEqual(seen, [None])
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+}})
+class CommentsPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(views.NUM_COMMENTS_PER_PAGE + 5)
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_post_detail_inlines_first_comments(self):
+        """На странице поста только первая порция комментариев."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), views.NUM_COMMENTS_PER_PAGE)
+        self.assertEqual(comments[0].text, 'Комментарий 0')
+        self.assertTrue(comments.has_next())
+        self.assertContains(response, comments.next_cursor)
+
+    def test_comments_fragment_continues_by_cursor(self):
+        """Фрагмент и JSON продолжают список с курсора."""
+        url = reverse('posts:post_comments', kwargs={'post_id': self.post.pk})
+        first = self.guest_client.get(url, {'format': 'json'}).json()
+        self.assertEqual(
+            len(first['comments']),
+            views.NUM_COMMENTS_PER_PAGE,
+        )
+        second = self.guest_client.get(
+            url,
+            {'format': 'json', 'cursor': first['next_cursor']},
+        ).json()
+        self.assertEqual(
+            [comment['text'] for comment in second['comments']],
+            [f'Комментарий {i}' for i in range(20, 25)],
+        )
+        self.assertIsNone(second['next_cursor'])
+        response = self.guest_client.get(
+            url,
+            {'cursor': first['next_cursor']},
+        )
+        self.assertTemplateUsed(response, 'posts/includes/comments.html')
+        self.assertContains(response, 'Комментарий 24')
+        self.assertNotContains(response, 'js-more-comments')
+
+    def test_comments_of_missing_post(self):
+        """Комментарии несуществующего поста — 404."""
+        response = self.guest_client.get(
+            reverse('posts:post_comments', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,50 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+
+
+class QueryBudgetMixin:
+    """Проверка бюджета SQL-запросов для каждой страницы приложения.
+
+    В query_budgets задается наибольшее допустимое число запросов
+    для каждого имени URL из urls_module.
+    """
+    urls_module = None
+    query_budgets = {}
+
+    @classmethod
+    def budgeted_url_names(cls):
+        namespace = cls.urls_module.app_name
+        return {
+            f'{namespace}:{pattern.name}'
+            for pattern in get_resolver(cls.urls_module).url_patterns
+        }
+
+    def assertAllViewsBudgeted(self):
+        """Для каждого URL приложения объявлен бюджет."""
+        missing = self.budgeted_url_names() - set(self.query_budgets)
+        self.assertFalse(
+            missing,
+            f'Не задан бюджет запросов для: {", ".join(sorted(missing))}',
+        )
+
+    def assertQueryBudget(self, name, url, client, method='get', **kwargs):
+        """Запрос к странице укладывается в объявленный бюджет."""
+        budget = self.query_budgets[name]
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, **kwargs)
+            if response.streaming:
+                # Потоковый ответ обращается к базе при чтении тела.
+                response.streaming_content = [
+                    b''.join(response.streaming_content),
+                ]
+        queries = context.captured_queries
+        if len(queries) > budget:
+            sql = '\n'.join(
+                f'{index}. {query["sql"]}'
+                for index, query in enumerate(queries, start=1)
+            )
+            self.fail(
+                f'{name}: {len(queries)} запросов при бюджете {budget}\n{sql}'
+            )
+        return response
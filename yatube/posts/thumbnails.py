@@ -0,0 +1,76 @@
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from core import jobs as queue
+
+from .models import Post, ThumbnailJob
+
+
+def schedule(post):
+    """Ставит в очередь подготовку миниатюры для картинки поста."""
+    if post.image:
+        ThumbnailJob.objects.create(post=post)
+
+
+def enqueue_missing():
+    """Ставит в очередь посты с картинкой, но без миниатюры."""
+    posts = Post.objects.exclude(image='').filter(thumbnail_url='').exclude(
+        thumbnail_jobs__status__in=(
+            ThumbnailJob.PENDING,
+            ThumbnailJob.RUNNING,
+        ),
+    ).values_list('pk', flat=True)
+    jobs = ThumbnailJob.objects.bulk_create(
+        ThumbnailJob(post_id=post_id) for post_id in posts.iterator()
+    )
+    return len(jobs)
+
+
+def claim(limit):
+    """Забирает задания из очереди, зависшие задания берутся повторно."""
+    return queue.claim(
+        ThumbnailJob,
+        limit,
+        settings.THUMBNAIL_JOB_TIMEOUT,
+        settings.THUMBNAIL_JOB_MAX_ATTEMPTS,
+    )
+
+
+def process(job_id):
+    """Готовит миниатюру и сохраняет ее адрес в посте.
+
+    Если пост с заданием удалили после захвата, задание пропускается.
+    """
+    try:
+        job = ThumbnailJob.objects.select_related('post').get(pk=job_id)
+    except ThumbnailJob.DoesNotExist:
+        return None
+    post = job.post
+    try:
+        if post.image:
+            thumbnail = get_thumbnail(
+                post.image,
+                settings.POST_THUMBNAIL_GEOMETRY,
+                crop='center',
+                upscale=True,
+            )
+            post.thumbnail_url = thumbnail.url
+            post.save(update_fields=['thumbnail_url', 'updated_at'])
+    except Exception as error:
+        job.error = repr(error)
+        if job.attempts < settings.THUMBNAIL_JOB_MAX_ATTEMPTS:
+            job.status = ThumbnailJob.PENDING
+        else:
+            job.status = ThumbnailJob.FAILED
+    else:
+        job.status = ThumbnailJob.DONE
+        job.error = ''
+    job.save(update_fields=['status', 'error'])
+    return job.status
+
+
+def run_pending(workers=1, batch=None):
+    """Обрабатывает пачку заданий, возвращает число обработанных."""
+    job_ids = claim(batch or workers * 10)
+    queue.run_in_threads(process, job_ids, workers)
+    return len(job_ids)
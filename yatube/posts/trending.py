@@ -0,0 +1,117 @@
+import heapq
+import time
+from collections import defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+
+from . import cache as page_cache
+from .models import ActivityCounter, Group, Post
+
+TRENDING_KEY = 'posts:trending'
+EMPTY = {'posts': [], 'groups': []}
+
+
+def current_bucket(now=None):
+    """Номер интервала времени длиной TRENDING_BUCKET_SECONDS."""
+    if now is None:
+        now = time.time()
+    return int(now // settings.TRENDING_BUCKET_SECONDS)
+
+
+def record(*objects):
+    """Увеличивает счетчики текущего интервала одним запросом.
+
+    objects — пары (ActivityCounter.POST или GROUP, id).
+    """
+    objects = list(dict.fromkeys(objects))
+    if not objects:
+        return
+    using = router.db_for_write(ActivityCounter)
+    ops = connections[using].ops
+    meta = ActivityCounter._meta
+    table = ops.quote_name(meta.db_table)
+    kind, object_id, bucket, count = (
+        ops.quote_name(meta.get_field(name).column)
+        for name in ('kind', 'object_id', 'bucket', 'count')
+    )
+    sql = (
+        f'INSERT INTO {table} ({kind}, {object_id}, {bucket}, {count}) '
+        f'VALUES {", ".join(["(%s, %s, %s, 1)"] * len(objects))} '
+        f'ON CONFLICT ({kind}, {object_id}, {bucket}) '
+        f'DO UPDATE SET {count} = {table}.{count} + 1'
+    )
+    now = current_bucket()
+    params = [
+        value for pair in objects for value in (*pair, now)
+    ]
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def get_trending():
+    """Готовый список для боковой панели, одно чтение из кеша."""
+    return cache.get(TRENDING_KEY, EMPTY)
+
+
+def _top(scores):
+    return heapq.nlargest(
+        settings.TRENDING_SIZE, scores.items(), key=itemgetter(1),
+    )
+
+
+def compact():
+    """Пересчитывает популярное и удаляет устаревшие интервалы.
+
+    Вклад интервала затухает вдвое каждые TRENDING_HALF_LIFE
+    интервалов. Возвращает число удаленных интервалов.
+    """
+    now = current_bucket()
+    oldest = now - settings.TRENDING_WINDOW + 1
+    deleted, _ = ActivityCounter.objects.filter(bucket__lt=oldest).delete()
+    scores = {
+        ActivityCounter.POST: defaultdict(float),
+        ActivityCounter.GROUP: defaultdict(float),
+    }
+    rows = ActivityCounter.objects.filter(bucket__gte=oldest).values_list(
+        'kind', 'object_id', 'bucket', 'count',
+    )
+    for kind, object_id, bucket, count in rows.iterator():
+        decay = 0.5 ** ((now - bucket) / settings.TRENDING_HALF_LIFE)
+        scores[kind][object_id] += count * decay
+    top_posts = _top(scores[ActivityCounter.POST])
+    top_groups = _top(scores[ActivityCounter.GROUP])
+    posts = {
+        row['pk']: row for row in Post.objects.filter(
+            pk__in=[pk for pk, _ in top_posts],
+        ).values('pk', 'text', 'author__username')
+    }
+    groups = {
+        row['pk']: row for row in Group.objects.filter(
+            pk__in=[pk for pk, _ in top_groups],
+        ).values('pk', 'slug', 'title')
+    }
+    trending = {
+        'posts': [
+            {
+                'id': pk,
+                'text': posts[pk]['text'][:60],
+                'author': posts[pk]['author__username'],
+                'score': round(score, 2),
+            }
+            for pk, score in top_posts if pk in posts
+        ],
+        'groups': [
+            {
+                'slug': groups[pk]['slug'],
+                'title': groups[pk]['title'],
+                'score': round(score, 2),
+            }
+            for pk, score in top_groups if pk in groups
+        ],
+    }
+    cache.set(TRENDING_KEY, trending, None)
+    page_cache.bump('trending')
+    return deleted
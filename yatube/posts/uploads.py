@@ -0,0 +1,43 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку на диск частями и не больше допустимого размера.
+
+    Лишние байты только считаются, итоговый размер сохраняется
+    в файле, чтобы форма отклонила его без чтения содержимого.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received <= settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = self.received
+        return self.file
+
+
+def limit_uploads(view):
+    """Загрузки в этот view принимает LimitedUploadHandler.
+
+    Обработчики ставятся до чтения request.POST, поэтому проверка
+    CSRF переносится из middleware внутрь view. Остальные формы
+    (например, админка) загружают файлы обработчиками по умолчанию.
+    """
+    protected = csrf_protect(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [LimitedUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+    return csrf_exempt(wrapper)
@@ -1,58 +1,97 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.core.paginator import Paginator
 from django.shortcuts import redirect
-from django.views.decorators.cache import cache_page
 
-from .models import Post, Group, User, Comment, Follow
-from .forms import PostForm, CommentForm
+from core.ratelimit import ratelimit
+
+from . import (
+    counters,
+    feeds,
+    follows,
+    search as post_search,
+    thumbnails,
+    trending,
+)
+from .cache import (
+    cached_page,
+    conditional_page,
+    group_scopes,
+    index_scopes,
+    post_scopes,
+    profile_scopes,
+)
+from .models import Post, Group, User, Comment
+from .forms import PostForm, CommentForm, SearchForm
+from .paginator import CursorPaginator
+from .uploads import limit_uploads
 
 NUM_OBJECTS_PER_PAGE = 10
+NUM_COMMENTS_PER_PAGE = 20
+
+
+def get_page(request, post_list):
+    """Страница постов: по курсору или по номеру для старых ссылок."""
+    if settings.POSTS_PAGINATION == 'offset':
+        paginator = Paginator(post_list, NUM_OBJECTS_PER_PAGE)
+        return paginator.get_page(request.GET.get('page'))
+    paginator = CursorPaginator(post_list, NUM_OBJECTS_PER_PAGE)
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+def get_comments_page(post_id, cursor=None):
+    """Страница комментариев поста по ключу (created, id)."""
+    paginator = CursorPaginator(
+        Comment.objects.for_detail().filter(post=post_id),
+        NUM_COMMENTS_PER_PAGE,
+        ordering=('created', 'id'),
+    )
+    return paginator.get_page(cursor)
 
 
-@cache_page(20, key_prefix='index_page')
+@conditional_page(index_scopes)
+@cached_page(index_scopes)
 def index(request):
     """Главная страница."""
     template = 'posts/index.html'
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, NUM_OBJECTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.for_listing()
+    page_obj = get_page(request, post_list)
     context = {
         'page_obj': page_obj,
         'index': True,
+        'trending': trending.get_trending(),
     }
     return render(request, template, context)
 
 
+@conditional_page(group_scopes)
+@cached_page(group_scopes)
 def group_posts(request, slug):
     """Страница с записями группы."""
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, NUM_OBJECTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = group.posts.for_listing()
+    page_obj = get_page(request, post_list)
     context = {
         'group': group,
         'page_obj': page_obj,
+        'trending': trending.get_trending(),
     }
     return render(request, template, context)
 
 
+@conditional_page(profile_scopes)
+@cached_page(profile_scopes)
 def profile(request, username):
     """Страница пользователя."""
     template = 'posts/profile.html'
-    author = User.objects.get(username=username)
-    post_list = Post.objects.filter(author=author)
-    paginator = Paginator(post_list, NUM_OBJECTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    count_obj = paginator.count
-    following = (
-        request.user.is_authenticated
-        and author.following.filter(user=request.user).exists()
-    )
+    author = User.objects.select_related('stats').get(username=username)
+    post_list = Post.objects.for_listing().filter(author=author)
+    page_obj = get_page(request, post_list)
+    count_obj = counters.get_stats(author).posts_count
+    following = author.pk in follows.get_followee_ids(request.user)
 
     context = {
         'author': author,
@@ -63,22 +102,82 @@ def profile(request, username):
     return render(request, template, context)
 
 
+@conditional_page(post_scopes)
+@cached_page(post_scopes, anonymous_only=True)
 def post_detail(request, post_id):
     """Страница отдельного поста."""
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
-    count_obj = Post.objects.filter(author=post.author).count()
+    post = get_object_or_404(Post.objects.for_detail(), pk=post_id)
+    count_obj = counters.get_stats(post.author).posts_count
     form = CommentForm(request.POST or None)
-    comments_post = Comment.objects.filter(post=post_id)
     context = {
         'post': post,
         'count_obj': count_obj,
         'form': form,
-        'comments': comments_post,
+        'comments': get_comments_page(post.pk),
     }
     return render(request, template, context)
 
 
+@conditional_page(post_scopes)
+@cached_page(post_scopes)
+def post_comments(request, post_id):
+    """Следующая страница комментариев: HTML-фрагмент или JSON."""
+    get_object_or_404(Post.objects.only('id'), pk=post_id)
+    comments = get_comments_page(post_id, request.GET.get('cursor'))
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next_cursor': comments.next_cursor,
+        })
+    context = {
+        'post_id': post_id,
+        'comments': comments,
+    }
+    return render(request, 'posts/includes/comments.html', context)
+
+
+def search(request):
+    """Поиск по постам."""
+    template = 'posts/search.html'
+    form = SearchForm(request.GET or None)
+    page_obj = None
+    page_query = ''
+    if form.is_valid():
+        post_list = Post.objects.for_listing()
+        if form.cleaned_data['group']:
+            post_list = post_list.filter(group=form.cleaned_data['group'])
+        if form.cleaned_data['author']:
+            post_list = post_list.filter(
+                author__username=form.cleaned_data['author'],
+            )
+        post_list = post_search.search_posts(
+            form.cleaned_data['q'],
+            post_list,
+        )
+        paginator = Paginator(post_list, NUM_OBJECTS_PER_PAGE)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        query = request.GET.copy()
+        query.pop('page', None)
+        page_query = f'{query.urlencode()}&'
+    context = {
+        'form': form,
+        'page_obj': page_obj,
+        'page_query': page_query,
+    }
+    return render(request, template, context)
+
+
+@limit_uploads
+@ratelimit('post_create')
 @login_required
 def post_create(request):
     """Страница создания поста."""
@@ -90,18 +189,20 @@ def post_create(request):
         new_post = form.save(commit=False)
         new_post.author = request.user
         new_post.save()
+        thumbnails.schedule(new_post)
         return redirect('posts:profile', username=request.user)
 
     return render(request, template, {'form': form})
 
 
+@limit_uploads
 @login_required
 def post_edit(request, post_id):
     """Страница редактирования поста."""
     template = 'posts/create_post.html'
     post = get_object_or_404(Post, pk=post_id)
 
-    if post.author != request.user:
+    if post.author_id != request.user.pk:
         return redirect('posts:post_detail', post_id=post_id)
 
     form = PostForm(
@@ -113,7 +214,12 @@ def post_edit(request, post_id):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
+        image_changed = 'image' in form.changed_data
+        if image_changed:
+            post.thumbnail_url = ''
         post.save()
+        if image_changed:
+            thumbnails.schedule(post)
         return redirect('posts:post_detail', post_id=post_id)
 
     context = {
@@ -124,6 +230,7 @@ def post_edit(request, post_id):
     return render(request, template, context)
 
 
+@ratelimit('add_comment')
 @login_required
 def add_comment(request, post_id):
     """Добавить комментарий к посту."""
@@ -142,10 +249,8 @@ def follow_index(request):
     """Страница с постами авторов, на которые подписан пользователь."""
     template = 'posts/follow.html'
     user = request.user
-    post_list = Post.objects.filter(author__following__user=user)
-    paginator = Paginator(post_list, NUM_OBJECTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = feeds.get_timeline(user).for_listing()
+    page_obj = get_page(request, post_list)
     context = {
         'page_obj': page_obj,
         'follow': True,
@@ -153,33 +258,20 @@ def follow_index(request):
     return render(request, template, context)
 
 
+@ratelimit('profile_follow', methods=None)
 @login_required
 def profile_follow(request, username):
     """Подписаться на автора."""
-    follow = get_object_or_404(User, username=username)
-    is_exist = Follow.objects.filter(
-        user=request.user,
-        author=follow,
-    ).exists()
-    if follow != request.user and not is_exist:
-        Follow.objects.get_or_create(
-            user=request.user,
-            author=follow
-        )
+    author = get_object_or_404(User, username=username)
+    if author != request.user and follows.follow(request.user, author):
+        feeds.backfill(request.user, author)
     return redirect('posts:profile', username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
     """Отписаться на автора."""
-    unfollow = get_object_or_404(User, username=username)
-    is_exist = Follow.objects.filter(
-        user=request.user,
-        author=unfollow,
-    ).exists()
-    if unfollow != request.user and is_exist:
-        Follow.objects.filter(
-            user=request.user,
-            author=unfollow
-        ).delete()
+    author = get_object_or_404(User, username=username)
+    if follows.unfollow(request.user, author):
+        feeds.prune(request.user, author)
     return redirect('posts:profile', username=username)
@@ -1,5 +1,8 @@
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
 from django.contrib.auth import get_user_model
+from django.template import loader
+
+from notifications import outbox
 
 User = get_user_model()
 
@@ -9,3 +12,18 @@ class CreationForm(UserCreationForm):
         model = User
 
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class OutboxPasswordResetForm(PasswordResetForm):
+    """Сброс пароля: письмо ставится в очередь, ответ не ждет SMTP."""
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        subject = ''.join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html = None
+        if html_email_template_name is not None:
+            html = loader.render_to_string(html_email_template_name, context)
+        outbox.send_mail(subject, body, [to_email], from_email, html)
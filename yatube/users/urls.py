@@ -12,6 +12,7 @@ from django.urls import reverse_lazy
 from django.urls import path
 
 from . import views
+from .forms import OutboxPasswordResetForm
 
 app_name = 'users'
 
@@ -30,6 +31,7 @@ urlpatterns = [
     path(
         'password_reset/',
         PasswordResetView.as_view(
+            form_class=OutboxPasswordResetForm,
             template_name='users/password_reset_form.html',
             success_url=reverse_lazy('users:password_reset_done')),
         name='password_reset_form'
@@ -0,0 +1,307 @@
+"""
+Django settings for yatube project: common to all profiles.
+
+Profiles: yatube.settings.dev (manage.py default) and
+yatube.settings.prod (wsgi.py default).
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = '0pzvn4gr$-wur$ni4%v0-l7cn!di019-k!)1-m@et998&ix-!t'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+    'www.nkolman.pythonanywhere.com',
+    'nkolman.pythonanywhere.com',
+]
+
+# Application definition
+
+INSTALLED_APPS = [
+    'about.apps.AboutConfig',
+    'core.apps.CoreConfig',
+    'posts.apps.PostsConfig',
+    'notifications.apps.NotificationsConfig',
+    'users.apps.UsersConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.ReplicaMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+                'posts.context_processors.followee_ids',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+# wsgi.py прогревает процесс до первого запроса: импорт view,
+# reverse всех адресов и компиляция шаблонов (команда warmup).
+WARMUP_ON_START = False
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
+    }
+}
+
+# Настройки каждого нового соединения с SQLite: WAL не блокирует
+# читателей на время записи, busy_timeout ждет освобождения базы
+# вместо ошибки "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 20000,
+}
+
+# Реплики — псевдонимы из DATABASES, с которых читаются модели
+# DATABASE_REPLICA_APPS в запросах GET. После изменяющего запроса
+# клиент DATABASE_REPLICA_PIN_SECONDS читает из основной базы.
+DATABASE_ROUTERS = ['core.db.ReplicaRouter']
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_APPS = ('posts', 'auth')
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Письма и уведомления отправляет outbox_worker из очереди,
+# SITE_URL нужен для ссылок в письмах.
+OUTBOX_JOB_MAX_ATTEMPTS = 5
+OUTBOX_JOB_TIMEOUT = 300
+SITE_URL = 'http://127.0.0.1:8000'
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# Ограничение частоты запросов, меняющих данные, и выгрузки постов:
+# не больше N запросов за период (s, m, h, d) на пользователя, для
+# гостей — на IP. Счетчики скользящего окна хранятся в кеше, сверх
+# лимита RATELIMIT_VIEW отвечает 429.
+RATELIMITS = {
+    'post_create': '10/m',
+    'add_comment': '30/m',
+    'profile_follow': '60/m',
+    'signup': '5/h',
+    'post_export': '10/h',
+}
+RATELIMIT_VIEW = 'core.views.too_many_requests'
+
+# Общий кеш переживает процесс, тесты работают с пустым кешем
+# во временной папке.
+TEST_RUNNER = 'core.test_runner.DiscoverRunner'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Загруженные файлы отдает core.views.serve_media: потоком, с Range
+# и долгим кешированием. Если /media/ отдает веб-сервер, SERVE_MEDIA
+# можно выключить.
+SERVE_MEDIA = True
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+
+# Кеш в два уровня: L1 в памяти процесса на несколько секунд
+# и общий для всех процессов L2 (shared). Вместо файла SQLite
+# в shared можно подключить memcached или redis. Версии областей
+# и счетчики читаются мимо L1, поэтому инвалидация сразу видна
+# всем процессам.
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.TieredCache',
+        'LOCATION': 'default',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 5,
+            'L1_BYPASS': [
+                'posts:version:',
+                'posts:modified:',
+                'posts:stats:',
+                'posts:followees:',
+                'posts:trending',
+                'core:',
+            ],
+        },
+    },
+    'shared': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
+# Сжатие ответов: CompressionMiddleware убирает лишние пробелы
+# из HTML и сжимает ответы длиннее MIN_LENGTH в br (если установлен
+# пакет brotli) или gzip. Кеш страниц хранит уже сжатые варианты.
+COMPRESSION = {
+    'MIN_LENGTH': 200,
+    'MINIFY_HTML': True,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+# Лента подписок: посты авторов, у которых подписчиков стало больше
+# FEED_FANOUT_MAX_FOLLOWERS, не рассылаются по лентам, а читаются
+# напрямую. Рассылка возобновляется, только когда подписчиков
+# не больше FEED_FANOUT_RESUME_FOLLOWERS, чтобы автор на границе
+# не переключался туда и обратно при каждой отписке.
+FEED_FANOUT_MAX_FOLLOWERS = 1000
+FEED_FANOUT_RESUME_FOLLOWERS = 900
+
+# Пагинация списков постов: 'cursor' — по ключу (pub_date, id),
+# 'offset' — по номеру страницы для совместимости со старыми ссылками.
+POSTS_PAGINATION = 'cursor'
+
+# Страницы постов хранятся в кеше до изменения данных, версии
+# областей повышаются сигналами. Блокировка не дает нескольким
+# обработчикам одновременно пересобирать одну страницу.
+PAGE_CACHE_TIMEOUT = 60 * 60 * 6
+PAGE_CACHE_LOCK_TIMEOUT = 30
+
+# Карточки постов в лентах кешируются до изменения поста.
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Популярные посты и активные группы: счетчики активности
+# по интервалам TRENDING_BUCKET_SECONDS обновляются сигналами,
+# compact_trending раз в несколько минут пересчитывает TRENDING_SIZE
+# лучших за последние TRENDING_WINDOW интервалов. Вклад интервала
+# затухает вдвое каждые TRENDING_HALF_LIFE интервалов.
+TRENDING_BUCKET_SECONDS = 60 * 60
+TRENDING_WINDOW = 72
+TRENDING_HALF_LIFE = 12
+TRENDING_SIZE = 5
+
+# Миниатюры картинок постов готовит thumbnail_worker вне запроса.
+POST_THUMBNAIL_GEOMETRY = '960x339'
+THUMBNAIL_JOB_MAX_ATTEMPTS = 3
+THUMBNAIL_JOB_TIMEOUT = 300
+
+# Картинки постов пишутся на диск частями (posts.uploads.limit_uploads),
+# файлы больше POST_IMAGE_MAX_UPLOAD_SIZE отклоняются без чтения.
+# Картинка проверяется по заголовку, уменьшается до POST_IMAGE_MAX_SIDE
+# по большей стороне и пересохраняется без метаданных.
+POST_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40_000_000
+POST_IMAGE_MAX_SIDE = 1920
+POST_IMAGE_QUALITY = 85
+
+# Замеры запросов: сводка по страницам доступна администраторам
+# по адресу /admin/profiling/, доля SAMPLE_RATE запросов
+# дополнительно профилируется cProfile в PROFILE_DIR. Включено
+# только в профиле dev.
+PROFILING = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.0,
+    'PROFILE_DIR': os.path.join(BASE_DIR, 'profiles'),
+    'MAX_PROFILES': 100,
+}
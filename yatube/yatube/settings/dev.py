@@ -0,0 +1,16 @@
+"""Настройки для разработки: отладка и django-debug-toolbar."""
+
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE, PROFILING
+
+DEBUG = True
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+
+MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+PROFILING = {**PROFILING, 'ENABLED': True}
@@ -0,0 +1,30 @@
+"""Настройки для рабочих процессов: без отладки и dev-приложений."""
+
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import SECRET_KEY, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+# Шаблоны компилируются один раз и хранятся в памяти процесса.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+WARMUP_ON_START = True
+
+# Статика с хешем в имени и сжатыми копиями, нужен collectstatic.
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
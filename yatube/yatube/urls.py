@@ -1,12 +1,21 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core.views import profiling_stats, serve_media
 
 urlpatterns = [
+    path('admin/profiling/', profiling_stats, name='profiling_stats'),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
+    path(
+        'notifications/',
+        include('notifications.urls', namespace='notifications'),
+    ),
+    path('api/v1/', include('posts.api_urls', namespace='api')),
     path('', include('posts.urls', namespace='posts')),
     path('about/', include('about.urls', namespace='about')),
 ]
@@ -15,10 +24,13 @@ handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.permission'
 handler500 = 'core.views.server_error'
 
-if settings.DEBUG:
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
 
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
+
+if settings.SERVE_MEDIA:
+    media_prefix = re.escape(settings.MEDIA_URL.lstrip('/'))
+    urlpatterns += (
+        re_path(rf'^{media_prefix}(?P<path>.+)$', serve_media, name='media'),
     )
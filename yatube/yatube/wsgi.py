@@ -8,9 +8,18 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 """
 
 import os
+import sys
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings.prod')
 
 application = get_wsgi_application()
+
+if settings.WARMUP_ON_START:
+    from core.warmup import warm_up
+
+    # Процесс прогревается до того, как начнет принимать запросы.
+    for name, (seconds, count) in warm_up().items():
+        sys.stderr.write(f'warmup {name}: {count} in {seconds:.3f}s\n')